@@ -0,0 +1,280 @@
+"""
+Recorded upstream responses for the offline pipeline benchmark.
+
+Fixtures are raw response bodies under .benchmarks/fixtures: one Open-Meteo
+archive FlatBuffers message per variable and date range, the geocode.xyz JSON
+and the IEM outlook JSON. `record` captures them from the live APIs. Any fixture
+that was never recorded is synthesized on first use in the same wire format, so
+the benchmark always runs offline.
+
+    python -m benchmarks.fixtures record [--city Denver --state CO]
+"""
+import argparse
+import io
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlsplit
+
+import flatbuffers
+import numpy as np
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3 import HTTPResponse
+
+from clients.chunkedarchive import year_chunks
+from clients.sessions import ARCHIVE_URL, GEOCODE_URL, OUTLOOK_URL, geocode_params, outlook_params
+from outlooks.outlookstats import THRESHOLD_ORDER
+from trends.variables import VARIABLES, archive_params
+
+FIXTURE_DIR = os.path.join(".benchmarks", "fixtures")
+
+CITY = "Denver"
+STATE = "CO"
+LATITUDE = 39.74
+LONGITUDE = -104.99
+
+# Inclusive date ranges the benchmark runs each action at
+SIZES = {
+    "1d": ("2024-06-01", "2024-06-01"),
+    "31d": ("2024-06-01", "2024-07-01"),
+    "1y": ("2024-01-01", "2024-12-31"),
+    "40y": ("1985-01-01", "2024-12-31")
+}
+
+HOURS_PER_YEAR = 8766
+
+# Bodies already read or synthesized in this process
+_loaded = {}
+
+
+def encode_weather_api(latitude, longitude, start, interval, values, tz="GMT"):
+    """
+    Length-prefixed WeatherApiResponse with one hourly variable, as the archive API sends it
+    """
+    builder = flatbuffers.Builder(len(values) * 4 + 256)
+    vector = builder.CreateNumpyVector(np.asarray(values, dtype=np.float32))
+
+    # VariableWithValues: values is field 3
+    builder.StartObject(4)
+    builder.PrependUOffsetTRelativeSlot(3, vector, 0)
+    variable = builder.EndObject()
+
+    builder.StartVector(4, 1, 4)
+    builder.PrependUOffsetTRelative(variable)
+    variables = builder.EndVector()
+
+    # VariablesWithTime: time, time_end, interval, variables
+    builder.StartObject(4)
+    builder.PrependInt64Slot(0, start, 0)
+    builder.PrependInt64Slot(1, start + interval * len(values), 0)
+    builder.PrependInt32Slot(2, interval, 0)
+    builder.PrependUOffsetTRelativeSlot(3, variables, 0)
+    hourly = builder.EndObject()
+
+    timezone_name = builder.CreateString(tz)
+    timezone_abbreviation = builder.CreateString(tz)
+
+    # WeatherApiResponse: latitude, longitude, elevation, timezone, timezone_abbreviation, hourly
+    builder.StartObject(12)
+    builder.PrependFloat32Slot(0, latitude, 0)
+    builder.PrependFloat32Slot(1, longitude, 0)
+    builder.PrependFloat32Slot(2, 1600.0, 0)
+    builder.PrependUOffsetTRelativeSlot(7, timezone_name, 0)
+    builder.PrependUOffsetTRelativeSlot(8, timezone_abbreviation, 0)
+    builder.PrependUOffsetTRelativeSlot(11, hourly, 0)
+    builder.Finish(builder.EndObject())
+
+    message = bytes(builder.Output())
+    return len(message).to_bytes(4, "little") + message
+
+
+def _noise(index):
+    """
+    Deterministic noise in [-0.5, 0.5) keyed on an absolute hour or day, so
+    overlapping ranges synthesize identical values
+    """
+    return np.modf(np.abs(np.sin(index * 12.9898) * 43758.5453))[0] - 0.5
+
+
+def _synthetic_values(hourly, hours):
+    seasonal = np.sin(2 * np.pi * (hours - 2400) / HOURS_PER_YEAR)
+    diurnal = np.sin(2 * np.pi * (hours - 9) / 24)
+    noise = _noise(hours)
+    if hourly == "temperature_2m":
+        return 50 + 25 * seasonal + 10 * diurnal + 8 * noise
+    if hourly == "dew_point_2m":
+        return 35 + 18 * seasonal + 3 * diurnal + 6 * noise
+    # Rain in about one hour in twenty
+    return np.where(noise > 0.45, (noise - 0.45) * 2, 0)
+
+
+def _utc_timestamp(day):
+    return int(datetime.fromisoformat(day).replace(tzinfo=timezone.utc).timestamp())
+
+
+def synthetic_archive(hourly, start_date, end_date):
+    start = _utc_timestamp(start_date)
+    end = _utc_timestamp(end_date) + 24 * 3600
+    hours = np.arange(start, end, 3600, dtype=np.int64) // 3600
+    return encode_weather_api(LATITUDE, LONGITUDE, start, 3600, _synthetic_values(hourly, hours))
+
+
+def synthetic_geocode():
+    return json.dumps({"latt": str(LATITUDE), "longt": str(LONGITUDE), "standard": {"city": CITY}}).encode()
+
+
+def synthetic_outlooks():
+    """
+    Day 1 categorical outlook history over the largest benchmark range, roughly
+    one convective day in three with one to three updates each
+    """
+    first, last = SIZES["40y"]
+    days = np.arange(np.datetime64(first), np.datetime64(last) + 1)
+    noise = _noise(days.astype(np.int64)) + 0.5
+    days = days[noise < 0.35]
+    levels = (np.minimum(noise[noise < 0.35], 0.3499) / 0.35 * len(THRESHOLD_ORDER)).astype(int)
+
+    outlooks = []
+    for day, level in zip(days.astype(datetime), levels):
+        convective_day = datetime(day.year, day.month, day.day, 12, tzinfo=timezone.utc)
+        # Later updates on a day step the risk down, as often happens
+        for update in range(1 + level % 3):
+            issue = convective_day + timedelta(hours=4 * update)
+            outlooks.append({
+                "day": 1,
+                "threshold": THRESHOLD_ORDER[max(level - update, 0)],
+                "category": "CATEGORICAL",
+                "utc_product_issue": (issue - timedelta(hours=6)).strftime("%Y-%m-%dT%H:%MZ"),
+                "utc_issue": issue.strftime("%Y-%m-%dT%H:%MZ"),
+                "utc_expire": (convective_day + timedelta(days=1)).strftime("%Y-%m-%dT%H:%MZ")
+            })
+    return json.dumps({"outlooks": outlooks}).encode()
+
+
+def archive_name(hourly, start_date, end_date):
+    return f"archive_{hourly}_{start_date}_{end_date}.fb"
+
+
+def load(name, synthesize, fixture_dir=FIXTURE_DIR):
+    """
+    Fixture body by file name, synthesizing and saving it if it was never recorded
+    """
+    if name not in _loaded:
+        path = os.path.join(fixture_dir, name)
+        try:
+            with open(path, "rb") as fixture:
+                _loaded[name] = fixture.read()
+        except FileNotFoundError:
+            os.makedirs(fixture_dir, exist_ok=True)
+            _loaded[name] = synthesize()
+            with open(path, "wb") as fixture:
+                fixture.write(_loaded[name])
+    return _loaded[name]
+
+
+def archive_ranges():
+    """
+    Every (start, end) the benchmark requests: whole ranges for the point
+    actions and year-sized chunks for the trend actions
+    """
+    ranges = set()
+    for start_date, end_date in SIZES.values():
+        ranges.add((start_date, end_date))
+        ranges.update(year_chunks(start_date, end_date))
+    return sorted(ranges)
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Transport adapter answering archive, geocode and outlook requests from fixtures
+    """
+
+    def __init__(self):
+        super().__init__()
+        # Only for build_response; its send is never called
+        self._http = HTTPAdapter()
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        base = f"{url.scheme}://{url.netloc}{url.path}".rstrip("/")
+
+        status, content_type = 200, "application/json"
+        if base == ARCHIVE_URL:
+            hourly, start_date, end_date = query["hourly"], query["start_date"], query["end_date"]
+            body = load(archive_name(hourly, start_date, end_date),
+                        lambda: synthetic_archive(hourly, start_date, end_date))
+            content_type = "application/octet-stream"
+        elif base == GEOCODE_URL:
+            body = load("geocode.json", synthetic_geocode)
+        elif base == OUTLOOK_URL:
+            body = load("outlooks.json", synthetic_outlooks)
+        else:
+            status, body = 404, b"{}"
+
+        # A urllib3 response, as a live adapter returns, so the cache can store it
+        raw = HTTPResponse(body=io.BytesIO(body), status=status, preload_content=False,
+                           headers={"Content-Type": content_type, "Content-Length": str(len(body))},
+                           request_url=request.url)
+        return self._http.build_response(request, raw)
+
+    def close(self):
+        pass
+
+
+@contextmanager
+def replay_transport():
+    """
+    Answer every request from fixtures at the transport layer, so the sessions'
+    own cache, single-flight and retry layers above it still run
+    """
+    adapter = ReplayAdapter()
+    send = HTTPAdapter.send
+    HTTPAdapter.send = lambda self, request, **kwargs: adapter.send(request, **kwargs)
+    try:
+        yield
+    finally:
+        HTTPAdapter.send = send
+
+
+def record(city=CITY, state=STATE, fixture_dir=FIXTURE_DIR):
+    """
+    Capture every fixture the benchmark uses from the live APIs
+    """
+    os.makedirs(fixture_dir, exist_ok=True)
+    session = requests.Session()
+
+    def save(name, resp):
+        resp.raise_for_status()
+        with open(os.path.join(fixture_dir, name), "wb") as fixture:
+            fixture.write(resp.content)
+        print(f"Recorded {name} ({len(resp.content):,} bytes)")
+
+    geocode_resp = session.get(GEOCODE_URL, params=geocode_params(city, state))
+    save("geocode.json", geocode_resp)
+    latitude, longitude = geocode_resp.json()["latt"], geocode_resp.json()["longt"]
+
+    save("outlooks.json", session.get(OUTLOOK_URL, params=outlook_params(latitude, longitude)))
+
+    for variable, spec in VARIABLES.items():
+        for start_date, end_date in archive_ranges():
+            params = archive_params(variable, latitude, longitude, start_date, end_date)
+            save(archive_name(spec["hourly"], start_date, end_date),
+                 session.get(ARCHIVE_URL, params=dict(params, format="flatbuffers")))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.fixtures",
+                                         description="Record benchmark fixtures from the live APIs")
+    subcommands = arg_parser.add_subparsers(dest="command", required=True)
+    record_parser = subcommands.add_parser("record")
+    record_parser.add_argument("--city", default=CITY)
+    record_parser.add_argument("--state", default=STATE)
+    args = arg_parser.parse_args()
+    record(args.city, args.state)
+
+
+if __name__ == "__main__":
+    main()
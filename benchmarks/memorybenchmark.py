@@ -0,0 +1,73 @@
+"""
+Peak memory of the decode -> daily mean -> smoothing pipeline, per station-year.
+
+Compares the code the plotters ran before trends/hourlyseries.py with the
+helpers there. Both stay float32 end to end; the saving comes from wrapping
+the decoded values without copying them (hourly_frame's copy=False). Runs
+offline on synthetic hourly data.
+
+    python -m benchmarks.memorybenchmark
+"""
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from scipy import signal
+
+from trends.hourlyseries import hourly_frame, daily_mean, smooth_trend
+
+HOURS_PER_YEAR = 24 * 365
+YEAR_COUNTS = [1, 5, 20, 40]
+
+
+def synthetic_hourly(years):
+    """
+    Build a float32 hourly series the same shape as an archive response
+    """
+    hours = HOURS_PER_YEAR * years
+    dates = pd.date_range(start="1980-01-01", periods=hours, freq="h", tz="UTC")
+    phase = np.arange(hours, dtype=np.float32) * np.float32(2 * np.pi / HOURS_PER_YEAR)
+    values = np.float32(50) + np.float32(25) * np.sin(phase)
+    return dates, values
+
+
+def baseline_pipeline(dates, values):
+    """
+    The pipeline exactly as the plotters ran it before trends/hourlyseries.py
+    """
+    hourly_data = {"date": dates, "value": values}
+    hourly_dataframe = pd.DataFrame(data=hourly_data)
+    daily_data = hourly_dataframe.resample('D', on='date').mean()
+    daily_data = daily_data.reset_index()
+    return signal.savgol_filter(daily_data['value'], 14, 3)
+
+
+def hourlyseries_pipeline(dates, values):
+    hourly_dataframe = hourly_frame(dates, values, "value")
+    daily_data = daily_mean(hourly_dataframe)
+    return smooth_trend(daily_data['value'], 14, 3)
+
+
+def peak_bytes(pipeline, dates, values):
+    """
+    Peak bytes allocated while running a pipeline, excluding its inputs
+    """
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    pipeline(dates, values)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    print(f"{'years':>5} {'baseline B/stn-yr':>18} {'current B/stn-yr':>18} {'saving':>8}")
+    for years in YEAR_COUNTS:
+        dates, values = synthetic_hourly(years)
+        legacy = peak_bytes(baseline_pipeline, dates, values) / years
+        policy = peak_bytes(hourlyseries_pipeline, dates, values) / years
+        print(f"{years:>5} {legacy:>18,.0f} {policy:>18,.0f} {1 - policy / legacy:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Offline, stage-by-stage benchmark of every main.py menu action.
+
+Each stage calls the code the action itself runs: geocode() and the cached
+Open-Meteo clients (for trend actions fetch_archive() with its chunk thread
+pool), so the SQLite cache, single-flight and access tracking are all timed.
+Only the network is replaced, by responses replayed from recorded fixtures
+(benchmarks/fixtures.py) at the transport layer. The cache lives in
+.benchmarks/cache and is cleared before every run, so "fetch" is a cold miss
+and "refetch" the same request answered from the cache. The render stage draws
+the plotters' own pyplot figures with the Agg backend instead of showing them.
+
+Actions run at 1-day, 31-day, 1-year and 40-year ranges; trend actions skip
+ranges shorter than their 14-day smoothing window. For each stage the best wall
+time over --repeat runs and the peak traced allocation of one extra run are
+stored in .benchmarks/results.json under the current git commit, so runs on
+different commits can be compared.
+
+    python -m benchmarks.pipelinebenchmark [--actions 1 2 7] [--sizes 1d 40y] [--repeat 3] [--compare REV]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from datetime import date, datetime, timezone
+
+import matplotlib
+import matplotlib.pyplot as plt
+import pandas as pd
+import pytz
+import requests
+
+from benchmarks.fixtures import CITY, SIZES, STATE, replay_transport
+from clients import sessions
+from clients.chunkedarchive import fetch_archive
+from clients.sessions import ARCHIVE_URL, OUTLOOK_URL, geocode, openmeteo_client, outlook_params
+from outlooks.outlookarchives import OUTLOOK_HEADERS, fetch_json_data, filter_outlooks_by_time_range, outlook_row
+from reports.summary import console, export, print_series_summary, print_table
+from trends import (dewpointplotter, dewtrendplotter, precippointplotter, preciptrendplotter, temppointplotter,
+                    temptrendplotter)
+from trends.hourlyseries import daily_mean, decode_hourly, smooth_trend
+from trends.variables import VARIABLES, archive_params
+
+RESULTS_PATH = os.path.join(".benchmarks", "results.json")
+
+# Kept apart from the application's .cache.sqlite
+CACHE_NAME = os.path.join(".benchmarks", "cache")
+
+# The trend plotters' savgol window, in days
+TREND_WINDOW = 14
+
+# Menu number -> (title, kind, variable, plotting function)
+ACTIONS = {
+    "1": ("Temperature Plot", "point", "temperature", temppointplotter.plot_hourly),
+    "2": ("Temperature Trend", "trend", "temperature", temptrendplotter.plot_trend),
+    "3": ("Precipitation Plot", "point", "precipitation", precippointplotter.plot_hourly),
+    "4": ("Precipitation Trend", "trend", "precipitation", preciptrendplotter.plot_trend),
+    "5": ("Dew Point Plot", "point", "dewpoint", dewpointplotter.plot_hourly),
+    "6": ("Dew Point Trend", "trend", "dewpoint", dewtrendplotter.plot_trend),
+    "7": ("Convective Outlook Table", "outlook", None, None)
+}
+
+
+def _geocode(ctx):
+    ctx["location"] = geocode(CITY, STATE)
+
+
+def _archive_params(ctx):
+    location = ctx["location"]
+    return archive_params(ctx["variable"], location["latt"], location["longt"], ctx["start"], ctx["end"])
+
+
+def _fetch_range(ctx):
+    # The point plotters build a fresh client per action
+    ctx["responses"] = openmeteo_client().weather_api(ARCHIVE_URL, params=_archive_params(ctx))
+
+
+def _fetch_chunks(ctx):
+    # Includes stitching the chunks, which fetch_archive does before returning
+    _, ctx["hourly"] = fetch_archive(_archive_params(ctx), VARIABLES[ctx["variable"]]["hourly"])
+
+
+def _decode_range(ctx):
+    ctx["hourly"] = decode_hourly(ctx["responses"][0], VARIABLES[ctx["variable"]]["hourly"])
+
+
+def _summary(ctx):
+    spec = VARIABLES[ctx["variable"]]
+    with console.capture():
+        print_series_summary(ctx["hourly"], spec["hourly"], spec["unit"])
+
+
+def _aggregate(ctx):
+    daily_data = daily_mean(ctx["hourly"])
+    ctx["daily"] = daily_data
+    ctx["trend"] = smooth_trend(daily_data[VARIABLES[ctx["variable"]]["hourly"]], TREND_WINDOW, 3)
+
+
+def _draw(plot, *args):
+    plot(plt.figure(figsize=(12, 7)), *args, CITY, STATE)
+    # What plt.show() would draw on screen
+    plt.gcf().canvas.draw()
+    plt.close("all")
+
+
+def _render_point(ctx):
+    _draw(ctx["plot"], ctx["hourly"])
+
+
+def _render_trend(ctx):
+    _draw(ctx["plot"], ctx["daily"], ctx["trend"])
+
+
+def _fetch_outlooks(ctx):
+    location = ctx["location"]
+    url = f"{OUTLOOK_URL}?{requests.compat.urlencode(outlook_params(location['latt'], location['longt']))}"
+    ctx["outlooks"] = fetch_json_data(url)["outlooks"]
+
+
+def _filter_outlooks(ctx):
+    # The same UTC midnight bounds get_date_input produces
+    start_date = datetime.fromisoformat(ctx["start"]).replace(tzinfo=pytz.UTC)
+    end_date = datetime.fromisoformat(ctx["end"]).replace(hour=23, minute=59, tzinfo=pytz.UTC)
+    ctx["filtered"] = filter_outlooks_by_time_range(ctx["outlooks"], start_date=start_date, end_date=end_date)
+
+
+def _outlook_table(ctx):
+    with console.capture():
+        print_table(ctx["filtered"], headers=OUTLOOK_HEADERS, format_row=outlook_row, interactive=False)
+    Counter(outlook['threshold'] for outlook in ctx["filtered"])
+
+
+def _export_outlooks(ctx):
+    with tempfile.TemporaryDirectory() as out:
+        export(pd.DataFrame.from_records(ctx["filtered"]), os.path.join(out, "outlooks.csv"))
+
+
+STAGES = {
+    "point": [("geocode", _geocode), ("fetch", _fetch_range), ("refetch", _fetch_range),
+              ("decode", _decode_range), ("summary", _summary), ("render", _render_point)],
+    "trend": [("geocode", _geocode), ("fetch", _fetch_chunks), ("refetch", _fetch_chunks),
+              ("summary", _summary), ("aggregate", _aggregate), ("render", _render_trend)],
+    "outlook": [("geocode", _geocode), ("fetch", _fetch_outlooks), ("refetch", _fetch_outlooks),
+                ("filter", _filter_outlooks), ("table", _outlook_table), ("export", _export_outlooks)]
+}
+
+
+def _context(variable, plot, size):
+    # Every run starts from an empty cache, as the first query for a place does
+    sessions.cached_session().cache.clear()
+    start, end = SIZES[size]
+    return {
+        "variable": variable,
+        "plot": plot,
+        "start": start,
+        "end": end
+    }
+
+
+def _days(size):
+    start, end = SIZES[size]
+    return (date.fromisoformat(end) - date.fromisoformat(start)).days + 1
+
+
+def _run(stages, ctx, measure):
+    """
+    Run stages in order, returning {stage: measure(stage, ctx)} up to the first failure
+    """
+    results = {}
+    for name, stage in stages:
+        try:
+            results[name] = measure(stage, ctx)
+        except Exception as err:
+            results[name] = {"error": f"{type(err).__name__}: {err}"}
+            break
+    return results
+
+
+def _seconds(stage, ctx):
+    began = time.perf_counter()
+    stage(ctx)
+    return time.perf_counter() - began
+
+
+def _peak_bytes(stage, ctx):
+    # Traces only what the stage itself allocates; earlier stages' outputs are excluded
+    tracemalloc.start()
+    try:
+        stage(ctx)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark(kind, variable, plot, size, repeat):
+    stages = STAGES[kind]
+
+    # Warm-up run loads the fixtures, starts the chunk threads and imports matplotlib backends
+    _run(stages, _context(variable, plot, size), _seconds)
+    peaks = _run(stages, _context(variable, plot, size), _peak_bytes)
+
+    results = {}
+    for _ in range(repeat):
+        for name, seconds in _run(stages, _context(variable, plot, size), _seconds).items():
+            if isinstance(seconds, dict):
+                results[name] = seconds
+            elif name not in results or seconds < results[name]["seconds"]:
+                results[name] = {"seconds": seconds, "peak_bytes": peaks.get(name)}
+    return results
+
+
+def git_commit():
+    """
+    Short hash of HEAD, suffixed -dirty when tracked files have uncommitted changes
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def resolve_commit(rev):
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", rev], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return rev
+
+
+def load_results(path=RESULTS_PATH):
+    try:
+        with open(path) as results_file:
+            return json.load(results_file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_results(history, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as results_file:
+        json.dump(history, results_file, indent=1, sort_keys=True)
+
+
+def _format_change(current, previous):
+    if not previous or "seconds" not in previous or "seconds" not in current:
+        return ""
+    return f"{current['seconds'] / previous['seconds']:>8.2f}x"
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.pipelinebenchmark",
+                                         description="Offline stage timings for every menu action")
+    arg_parser.add_argument("--actions", nargs="+", choices=list(ACTIONS), default=list(ACTIONS))
+    arg_parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--compare", metavar="REV", help="show time relative to a stored run of this commit")
+    args = arg_parser.parse_args()
+
+    matplotlib.use("Agg")
+    # Read whenever a session is built, so every session in this process uses the benchmark cache
+    sessions.CACHE_NAME = CACHE_NAME
+    sessions.LOCK_DIR = f"{CACHE_NAME}.locks"
+
+    history = load_results()
+    commit = git_commit()
+    # Copied, since comparing against the current commit's previous run would otherwise see this run's results
+    baseline = json.loads(json.dumps(history.get(resolve_commit(args.compare), {}).get("actions", {}))) \
+        if args.compare else {}
+    if args.compare and not baseline:
+        print(f"No stored results for {args.compare}; showing this run only")
+
+    run = history.setdefault(commit, {"actions": {}})
+    run.update(recorded=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+               python=platform.python_version(), machine=platform.machine())
+
+    print(f"commit {commit}")
+    print(f"{'action':<26} {'size':>4} {'stage':<10} {'ms':>10} {'peak MB':>9} {'vs ' + args.compare if args.compare else ''}")
+    for action in args.actions:
+        title, kind, variable, plot = ACTIONS[action]
+        for size in args.sizes:
+            if kind == "trend" and _days(size) < TREND_WINDOW:
+                print(f"{title:<26} {size:>4} skipped: shorter than the {TREND_WINDOW}-day trend window")
+                continue
+            with replay_transport():
+                results = benchmark(kind, variable, plot, size, args.repeat)
+            run["actions"].setdefault(action, {})[size] = results
+            previous = baseline.get(action, {}).get(size, {})
+            for stage, result in results.items():
+                if "error" in result:
+                    print(f"{title:<26} {size:>4} {stage:<10} failed: {result['error']}")
+                    continue
+                peak = result["peak_bytes"]
+                print(f"{title:<26} {size:>4} {stage:<10} {result['seconds'] * 1000:>10.2f} "
+                      f"{peak / 1e6 if peak is not None else float('nan'):>9.2f} "
+                      f"{_format_change(result, previous.get(stage))}")
+
+    save_results(history)
+    print(f"Saved to {RESULTS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
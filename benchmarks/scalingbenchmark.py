@@ -0,0 +1,40 @@
+"""
+Wall-clock scaling of the process-pool analysis stage at 1, 4, 16 and 32 workers.
+
+Each station is one synthetic 10-year hourly series. Worker counts above the
+machine's core count are still run, but cannot be expected to scale.
+
+    python -m benchmarks.scalingbenchmark [stations]
+"""
+import os
+import sys
+import time
+
+from benchmarks.memorybenchmark import synthetic_hourly
+from trends.analysispool import analyze_stations
+
+WORKER_COUNTS = [1, 4, 16, 32]
+YEARS_PER_STATION = 10
+
+
+def main():
+    station_count = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+
+    dates, values = synthetic_hourly(YEARS_PER_STATION)
+    start = int(dates[0].timestamp())
+    stations = [(start, 3600, values) for _ in range(station_count)]
+
+    print(f"{station_count} stations x {YEARS_PER_STATION} years, {os.cpu_count()} cores available")
+    print(f"{'workers':>7} {'seconds':>9} {'speedup':>8} {'efficiency':>10}")
+    baseline = None
+    for workers in WORKER_COUNTS:
+        began = time.perf_counter()
+        analyze_stations(stations, workers=workers)
+        elapsed = time.perf_counter() - began
+        baseline = baseline or elapsed
+        speedup = baseline / elapsed
+        print(f"{workers:>7} {elapsed:>9.2f} {speedup:>8.2f} {speedup / workers:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
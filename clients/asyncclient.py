@@ -0,0 +1,166 @@
+import asyncio
+import io
+import json
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+import requests_cache
+import urllib3
+from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse
+
+from clients.cachemanager import record_access
+from clients.sessions import (BACKOFF_FACTOR, GEOCODE_URL, LOCK_DIR, OUTLOOK_URL, RETRIES, STATUS_TO_RETRY,
+                              TIMEOUT, cached_session, expire_after_for, geocode_params, outlook_params)
+from clients.singleflight import async_single_flight
+
+# Requests allowed in flight against any one host
+PER_HOST_LIMIT = 8
+
+
+def decode_weather_api(data):
+    """
+    Split a length-prefixed Open-Meteo FlatBuffers payload into WeatherApiResponse messages
+    """
+    messages = []
+    pos = 0
+    while pos < len(data):
+        length = int.from_bytes(data[pos:pos + 4], byteorder="little")
+        messages.append(WeatherApiResponse.GetRootAs(data, pos + 4))
+        pos += length + 4
+    return messages
+
+
+def backoff_delay(attempt):
+    """
+    Seconds to wait before retry number `attempt`, following urllib3's Retry backoff
+    """
+    if attempt <= 1:
+        return 0
+    return BACKOFF_FACTOR * (2 ** (attempt - 1))
+
+
+def _as_requests_response(prepared, status, reason, headers, body):
+    """
+    Wrap an aiohttp result in a requests.Response so requests_cache can store it
+    """
+    response = requests.Response()
+    response.status_code = status
+    response.reason = reason
+    response.url = prepared.url
+    response.request = prepared
+    response.headers = requests.structures.CaseInsensitiveDict(headers)
+    response._content = body
+    response._content_consumed = True
+    response.raw = urllib3.HTTPResponse(body=io.BytesIO(b""), headers=headers, status=status,
+                                        reason=reason, preload_content=False, request_url=prepared.url)
+    return response
+
+
+class AsyncClient:
+    """
+    asyncio client for Open-Meteo, geocode.xyz and IEM requests.
+
+    Each host gets its own semaphore so large fan-outs stay polite, failed
+    requests are retried with the same policy as the sync session, and
+    Open-Meteo responses are read from and written to the same requests_cache
+    store the sync path uses.
+
+        async with AsyncClient() as client:
+            responses = await client.weather_api(ARCHIVE_URL, params)
+    """
+
+    def __init__(self, per_host_limit=PER_HOST_LIMIT, cache_session=None, lock_dir=LOCK_DIR):
+        self.per_host_limit = per_host_limit
+        self.cache_session = cache_session if cache_session is not None else cached_session()
+        self.cache = self.cache_session.cache
+        self.lock_dir = lock_dir
+        self._semaphores = {}
+        self._inflight = {}
+        self._session = None
+
+    async def __aenter__(self):
+        # Concurrency is bounded by the per-host semaphores, not the connector
+        self._session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(sock_connect=TIMEOUT, sock_read=TIMEOUT),
+            connector=aiohttp.TCPConnector(limit=0)
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._session.close()
+
+    def _semaphore(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._semaphores[host]
+
+    async def _fetch_with_retry(self, url):
+        """
+        GET a URL, retrying connection errors and STATUS_TO_RETRY responses up to RETRIES times
+        """
+        for attempt in range(RETRIES + 1):
+            # Sleep outside the semaphore so a backing-off request does not hold a slot
+            await asyncio.sleep(backoff_delay(attempt))
+            try:
+                async with self._semaphore(url):
+                    async with self._session.get(url) as resp:
+                        body = await resp.read()
+                        if resp.status in STATUS_TO_RETRY and attempt < RETRIES:
+                            continue
+                        if resp.status >= 400:
+                            raise requests.HTTPError(f"{resp.status} {resp.reason} for url: {url}")
+                        return resp.status, resp.reason, dict(resp.headers), body
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                if attempt == RETRIES:
+                    raise requests.ConnectionError(f"{url}: {err}") from err
+
+    async def get(self, url, params=None, cached=True):
+        """
+        Fetch a URL and return the body bytes.
+
+        Errors surface as requests exceptions, so callers handle them the same
+        way as on the sync path. With cached=True the response is looked up and
+        stored under the key requests_cache would use for the same request.
+        """
+        prepared = requests.Request('GET', url, params=params).prepare()
+        key = self.cache.create_key(prepared)
+
+        if not cached:
+            return (await self._fetch_with_retry(prepared.url))[3]
+
+        hit = await self._cached_response(key)
+        if hit is None:
+            # Identical concurrent misses wait here and then read what the first one stored
+            async with async_single_flight(key, self.lock_dir, self._inflight):
+                hit = await self._cached_response(key)
+                if hit is None:
+                    status, reason, headers, body = await self._fetch_with_retry(prepared.url)
+                    response = _as_requests_response(prepared, status, reason, headers, body)
+                    expires = requests_cache.get_expiration_datetime(expire_after_for(prepared))
+                    await asyncio.to_thread(self.cache.save_response, response, key, expires)
+                    await asyncio.to_thread(record_access, self.cache_session, key, response)
+                    return body
+
+        await asyncio.to_thread(record_access, self.cache_session, key, hit)
+        return hit.content
+
+    async def _cached_response(self, key):
+        hit = await asyncio.to_thread(self.cache.get_response, key)
+        if hit is not None and not hit.is_expired:
+            return hit
+        return None
+
+    async def weather_api(self, url, params):
+        """
+        Async equivalent of openmeteo_requests.Client.weather_api
+        """
+        params = dict(params, format="flatbuffers")
+        return decode_weather_api(await self.get(url, params))
+
+    async def geocode(self, city, state):
+        return json.loads(await self.get(f"{GEOCODE_URL}/", geocode_params(city, state)))
+
+    async def outlooks(self, latitude, longitude):
+        return json.loads(await self.get(OUTLOOK_URL, outlook_params(latitude, longitude)))
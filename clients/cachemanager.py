@@ -0,0 +1,220 @@
+"""
+Lifecycle management for the requests_cache SQLite store.
+
+Tracks hits/misses and last access per entry next to the responses table,
+evicts least-recently-used entries once the store passes a size budget, and
+compacts the file.
+
+    python -m clients.cachemanager stats
+    python -m clients.cachemanager evict [--max-mb N]
+    python -m clients.cachemanager compact
+"""
+import argparse
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# Size budget for the responses table before least-recently-used entries are evicted
+MAX_CACHE_BYTES = 1024 * 1024 * 1024
+
+# Accesses buffered in memory before being written to the cache file in one transaction
+FLUSH_EVERY = 200
+FLUSH_SECONDS = 30
+
+# db_path -> accesses not yet written: per-key [last_access, hits] plus hit/miss counts
+_pending = {}
+_pending_lock = threading.Lock()
+
+# db_paths with an eviction running in the background
+_evicting = set()
+
+
+@contextmanager
+def _connect(db_path):
+    """
+    Autocommit connection to the cache file with the bookkeeping tables in place
+    """
+    con = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    try:
+        con.execute("CREATE TABLE IF NOT EXISTS access (key TEXT PRIMARY KEY, last_access REAL, hits INTEGER)")
+        con.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)")
+        yield con
+    finally:
+        con.close()
+
+
+def db_path_of(session):
+    return str(session.cache.db_path)
+
+
+def record_access(session, key, response):
+    """
+    SingleFlightSession on_response hook: count the hit or miss and touch the entry.
+
+    Accesses are buffered in memory and written in one transaction every
+    FLUSH_EVERY accesses or FLUSH_SECONDS, so a cache hit costs a dict update
+    rather than a write to the cache file.
+    """
+    from_cache = getattr(response, "from_cache", False)
+    db_path = db_path_of(session)
+    now = time.time()
+    with _pending_lock:
+        batch = _pending.setdefault(db_path, {"touches": {}, "hits": 0, "misses": 0, "since": now})
+        touch = batch["touches"].setdefault(key, [now, 0])
+        touch[0] = now
+        touch[1] += 1
+        batch["hits" if from_cache else "misses"] += 1
+        due = batch["hits"] + batch["misses"] >= FLUSH_EVERY or now - batch["since"] >= FLUSH_SECONDS
+    if due:
+        _flush(db_path)
+
+
+def _flush(db_path, check_size=True):
+    """
+    Write buffered accesses for one cache file. With check_size, if the batch added
+    entries and the live pages now exceed MAX_CACHE_BYTES, evict in a background thread.
+    """
+    with _pending_lock:
+        batch = _pending.pop(db_path, None)
+    if not batch:
+        return
+
+    with _connect(db_path) as con:
+        con.execute("BEGIN")
+        con.executemany("INSERT INTO counters VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                        [("hits", batch["hits"]), ("misses", batch["misses"])])
+        con.executemany("INSERT INTO access VALUES (?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                        "last_access = MAX(last_access, excluded.last_access), hits = hits + excluded.hits",
+                        [(key, last_access, hits) for key, (last_access, hits) in batch["touches"].items()])
+        con.execute("COMMIT")
+        # Pages in use, not file size: the file does not shrink after an eviction until compact()
+        live_bytes = con.execute("SELECT (page_count - freelist_count) * page_size "
+                                 "FROM pragma_page_count(), pragma_freelist_count(), pragma_page_size()").fetchone()[0]
+
+    if check_size and batch["misses"] and live_bytes > MAX_CACHE_BYTES:
+        with _pending_lock:
+            if db_path in _evicting:
+                return
+            _evicting.add(db_path)
+        threading.Thread(target=_evict_in_background, args=(db_path, MAX_CACHE_BYTES), daemon=True).start()
+
+
+def _evict_in_background(db_path, max_bytes):
+    try:
+        _evict(db_path, max_bytes)
+    finally:
+        with _pending_lock:
+            _evicting.discard(db_path)
+
+
+@atexit.register
+def _flush_all():
+    for db_path in list(_pending):
+        _flush(db_path)
+
+
+def stats(session):
+    """
+    Entry count, payload and file size, expired entries and hit rate for the cache
+    """
+    db_path = db_path_of(session)
+    _flush(db_path, check_size=False)
+    with _connect(db_path) as con:
+        entries, payload_bytes = con.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM responses").fetchone()
+        expired = con.execute("SELECT COUNT(*) FROM responses WHERE expires IS NOT NULL AND expires <= ?",
+                              (time.time(),)).fetchone()[0]
+        counters = dict(con.execute("SELECT name, value FROM counters").fetchall())
+
+    hits = counters.get("hits", 0)
+    misses = counters.get("misses", 0)
+    return {
+        "entries": entries,
+        "expired": expired,
+        "payload_bytes": payload_bytes,
+        "file_bytes": os.path.getsize(db_path) if os.path.exists(db_path) else 0,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / (hits + misses) if hits + misses else 0.0
+    }
+
+
+def evict(session, max_bytes=MAX_CACHE_BYTES):
+    """
+    Drop expired entries, then least-recently-used ones until the payload fits in max_bytes.
+    Entries with no recorded access (written before tracking existed) go first.
+    Returns the number of entries removed.
+    """
+    db_path = db_path_of(session)
+    _flush(db_path, check_size=False)
+    return _evict(db_path, max_bytes)
+
+
+def _evict(db_path, max_bytes):
+    with _connect(db_path) as con:
+        removed = _delete_expired(con)
+        total = con.execute("SELECT COALESCE(SUM(LENGTH(value)), 0) FROM responses").fetchone()[0]
+        if total <= max_bytes:
+            return removed
+        rows = con.execute(
+            "SELECT r.key, LENGTH(r.value) FROM responses r LEFT JOIN access a ON a.key = r.key "
+            "ORDER BY COALESCE(a.last_access, 0) ASC"
+        ).fetchall()
+        victims = []
+        for key, size in rows:
+            if total <= max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+
+        con.execute("BEGIN")
+        con.executemany("DELETE FROM responses WHERE key = ?", victims)
+        con.executemany("DELETE FROM access WHERE key = ?", victims)
+        con.execute("COMMIT")
+    return removed + len(victims)
+
+
+def _delete_expired(con):
+    return con.execute("DELETE FROM responses WHERE expires IS NOT NULL AND expires <= ?", (time.time(),)).rowcount
+
+
+def compact(session):
+    """
+    Remove expired entries and orphaned access rows, then VACUUM the file to return space to the OS
+    """
+    db_path = db_path_of(session)
+    _flush(db_path, check_size=False)
+    with _connect(db_path) as con:
+        _delete_expired(con)
+        con.execute("DELETE FROM access WHERE key NOT IN (SELECT key FROM responses)")
+        con.execute("VACUUM")
+
+
+def main():
+    from clients.sessions import cached_session
+
+    arg_parser = argparse.ArgumentParser(prog="python -m clients.cachemanager", description=__doc__.splitlines()[1])
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="print hit rate, size and entry count")
+    evict_parser = commands.add_parser("evict", help="evict LRU entries down to a size budget")
+    evict_parser.add_argument("--max-mb", type=float, default=MAX_CACHE_BYTES / (1024 * 1024))
+    commands.add_parser("compact", help="drop expired entries and VACUUM the file")
+    args = arg_parser.parse_args()
+
+    session = cached_session()
+    if args.command == "evict":
+        removed = evict(session, int(args.max_mb * 1024 * 1024))
+        print(f"Evicted {removed} entries")
+    elif args.command == "compact":
+        before = stats(session)["file_bytes"]
+        compact(session)
+        print(f"Compacted {before:,} -> {stats(session)['file_bytes']:,} bytes")
+
+    for name, value in stats(session).items():
+        print(f"{name}: {value:.1%}" if name == "hit_rate" else f"{name}: {value:,}")
+
+
+if __name__ == "__main__":
+    main()
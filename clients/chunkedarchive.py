@@ -0,0 +1,140 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import requests
+from openmeteo_requests.Client import OpenMeteoRequestsError
+
+from clients.sessions import ARCHIVE_URL, BACKOFF_FACTOR, pooled_openmeteo_client
+from trends.hourlyseries import SERIES_DTYPE, hourly_frame
+
+# Year-sized chunks fetched at once, across every caller in the process
+CHUNK_WORKERS = 4
+
+# Extra attempts for one chunk after the session's own transport retries give up
+CHUNK_RETRIES = 3
+
+# Shared so its threads keep their pooled sessions warm between requests
+_executor = ThreadPoolExecutor(max_workers=CHUNK_WORKERS, thread_name_prefix="archive-chunk")
+
+
+def year_chunks(start_date, end_date):
+    """
+    Split an inclusive YYYY-MM-DD range into (start, end) pairs that never cross a year boundary
+    """
+    start = date.fromisoformat(start_date)
+    end = date.fromisoformat(end_date)
+
+    chunks = []
+    while start <= end:
+        chunk_end = min(date(start.year, 12, 31), end)
+        chunks.append((start.isoformat(), chunk_end.isoformat()))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def fetch_chunk(params, chunk_start, chunk_end):
+    """
+    Fetch one chunk of an archive request, retrying just this chunk on failure.
+    Each chunk is its own request, so it is cached on its own. Returns one
+    response per requested location.
+    """
+    chunk_params = dict(params, start_date=chunk_start, end_date=chunk_end)
+    for attempt in range(CHUNK_RETRIES + 1):
+        try:
+            return pooled_openmeteo_client().weather_api(ARCHIVE_URL, params=chunk_params)
+        except (requests.RequestException, OpenMeteoRequestsError) as err:
+            if attempt == CHUNK_RETRIES or not _is_transient(err):
+                raise
+            time.sleep(BACKOFF_FACTOR * (2 ** attempt))
+
+
+def _is_transient(err):
+    """
+    Whether a failed chunk is worth retrying: transport errors and 5xx responses are,
+    4xx responses (bad parameters, rate limiting) are not. openmeteo_requests wraps
+    every failure in OpenMeteoRequestsError, so the cause chain is walked.
+    """
+    while err is not None:
+        if isinstance(err, (requests.ConnectionError, requests.Timeout, requests.exceptions.RetryError)):
+            return True
+        if isinstance(err, requests.HTTPError):
+            return err.response is not None and err.response.status_code >= 500
+        err = err.__cause__
+    return False
+
+
+def fetch_archive(params, variable):
+    """
+    Fetch an hourly archive request in year-sized chunks across the shared thread pool.
+
+    params is the same dict the plotters pass to weather_api, with start_date
+    and end_date covering the whole range. Returns (response, hourly_dataframe):
+    the first chunk's response for location metadata, and the stitched series.
+    """
+    responses = [chunk_responses[0] for chunk_responses in _fetch_chunks(params)]
+    return responses[0], stitch_chunks(responses, variable)
+
+
+def fetch_grid_archive(params, locations):
+    """
+    Fetch a multi-location archive request (comma-separated latitude and longitude
+    in params) in year-sized chunks. Each chunk is one request for every location.
+
+    Returns (responses, dates, values): the first chunk's response per location,
+    the shared hourly time axis, and a (locations, hours) array with one row per
+    location in request order.
+    """
+    chunk_responses = _fetch_chunks(params)
+    for responses in chunk_responses:
+        if len(responses) != locations:
+            raise ValueError(f"Expected {locations} locations in the archive response, got {len(responses)}")
+
+    lengths = [responses[0].Hourly().Variables(0).ValuesLength() for responses in chunk_responses]
+    values = np.empty((locations, sum(lengths)), dtype=SERIES_DTYPE)
+    offset = 0
+    for responses, length in zip(chunk_responses, lengths):
+        for row, response in enumerate(responses):
+            values[row, offset:offset + length] = response.Hourly().Variables(0).ValuesAsNumpy()
+        offset += length
+
+    first = chunk_responses[0][0].Hourly()
+    dates = pd.date_range(
+        start=pd.to_datetime(first.Time(), unit="s", utc=True),
+        periods=values.shape[1],
+        freq=pd.Timedelta(seconds=first.Interval())
+    )
+    return chunk_responses[0], dates, values
+
+
+def _fetch_chunks(params):
+    chunks = year_chunks(params["start_date"], params["end_date"])
+    if not chunks:
+        raise ValueError(f"Start date {params['start_date']} is after end date {params['end_date']}")
+    return list(_executor.map(lambda chunk: fetch_chunk(params, *chunk), chunks))
+
+
+def stitch_chunks(responses, variable):
+    """
+    Join consecutive chunk responses into one hourly DataFrame.
+
+    Each chunk's FlatBuffers view is copied straight into one preallocated array,
+    so stitching costs a single copy instead of a per-chunk array plus a concatenate.
+    """
+    hourly_blocks = [response.Hourly() for response in responses]
+    lengths = [block.Variables(0).ValuesLength() for block in hourly_blocks]
+    values = np.empty(sum(lengths), dtype=SERIES_DTYPE)
+    offset = 0
+    for block, length in zip(hourly_blocks, lengths):
+        values[offset:offset + length] = block.Variables(0).ValuesAsNumpy()
+        offset += length
+
+    interval = hourly_blocks[0].Interval()
+    dates = pd.date_range(
+        start=pd.to_datetime(hourly_blocks[0].Time(), unit="s", utc=True),
+        periods=len(values),
+        freq=pd.Timedelta(seconds=interval)
+    )
+    return hourly_frame(dates, values, variable)
@@ -0,0 +1,156 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from datetime import date, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+import openmeteo_requests
+import requests
+import requests_cache
+from retry_requests import retry
+from dotenv import load_dotenv
+
+from clients.cachemanager import record_access
+from clients.singleflight import SingleFlightSession
+
+load_dotenv()
+
+authkey = os.getenv("APIKEY")
+
+# Shared by the sync session below and clients/asyncclient.py so both paths hit one cache
+CACHE_NAME = '.cache'
+LOCK_DIR = f"{CACHE_NAME}.locks"
+
+# Left out of cache keys and redacted from stored responses, so the geocode.xyz
+# key never reaches the cache file and rotating it keeps cached geocodes
+IGNORED_PARAMETERS = ["auth"]
+
+# Retry policy for every client: retry_requests/urllib3 semantics
+RETRIES = 5
+BACKOFF_FACTOR = 0.2
+STATUS_TO_RETRY = (500, 502, 504)
+
+# Seconds to wait for the first response bytes, on the sync and async paths alike
+TIMEOUT = 5
+
+GEOCODE_URL = "https://geocode.xyz"
+ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+OUTLOOK_URL = "https://mesonet.agron.iastate.edu/json/spcoutlook.py"
+
+# Cache TTL policies. Archive days older than ARCHIVE_SETTLE_DAYS no longer change
+# upstream, so ranges ending before then are kept forever; anything touching recent
+# days is revalidated.
+ARCHIVE_SETTLE_DAYS = 5
+RECENT_EXPIRE_AFTER = timedelta(hours = 1)
+OUTLOOK_EXPIRE_AFTER = timedelta(minutes = 30)
+GEOCODE_EXPIRE_AFTER = timedelta(days = 30)
+
+
+def expire_after_for(request):
+    """
+    Pick the cache expiration for a request from the TTL policies above
+    """
+    url = request.url
+    if url.startswith(ARCHIVE_URL):
+        end_date = parse_qs(urlsplit(url).query).get("end_date", [""])[0]
+        try:
+            settled = date.fromisoformat(end_date) <= date.today() - timedelta(days = ARCHIVE_SETTLE_DAYS)
+        except ValueError:
+            settled = False
+        return requests_cache.NEVER_EXPIRE if settled else RECENT_EXPIRE_AFTER
+    if url.startswith(OUTLOOK_URL):
+        return OUTLOOK_EXPIRE_AFTER
+    if url.startswith(GEOCODE_URL):
+        return GEOCODE_EXPIRE_AFTER
+    return None
+
+
+def cached_session():
+    """
+    Cached requests session backed by the shared SQLite cache.
+    Identical concurrent misses are coalesced into one upstream fetch, expirations
+    follow expire_after_for() and every access is recorded for clients/cachemanager.py.
+    """
+    return SingleFlightSession(CACHE_NAME, lock_dir = LOCK_DIR, expire_after = -1, timeout = TIMEOUT,
+                               ignored_parameters = IGNORED_PARAMETERS,
+                               expire_after_for = expire_after_for, on_response = record_access)
+
+
+def retry_session():
+    return retry(cached_session(), retries = RETRIES, backoff_factor = BACKOFF_FACTOR)
+
+
+def openmeteo_client():
+    """
+    Setup the Open-Meteo API client with cache and retry on error
+    """
+    return openmeteo_requests.Client(session = retry_session())
+
+
+# Idle sessions kept for reuse. Server request threads are short-lived, so sessions
+# are lent out from this pool instead of being tied to a thread.
+SESSION_POOL_SIZE = 8
+_idle_sessions = queue.LifoQueue()
+
+
+@contextmanager
+def pooled_session():
+    """
+    Borrow a cached retry session, returning it to the pool afterwards so its
+    connections stay open for the next caller
+    """
+    try:
+        session = _idle_sessions.get_nowait()
+    except queue.Empty:
+        session = retry_session()
+    try:
+        yield session
+    finally:
+        if _idle_sessions.qsize() < SESSION_POOL_SIZE:
+            _idle_sessions.put(session)
+        else:
+            session.close()
+
+
+# One Open-Meteo client per thread. Only the long-lived chunk executor threads
+# (clients/chunkedarchive.py) call this, so the clients really are reused.
+_pool = threading.local()
+
+
+def pooled_openmeteo_client():
+    if not hasattr(_pool, "openmeteo"):
+        _pool.openmeteo = openmeteo_client()
+    return _pool.openmeteo
+
+
+def geocode_params(city, state):
+    return {
+        "locate": (city + " " + state),
+        "region": "US",
+        "json": "1",
+        "auth": authkey
+    }
+
+
+def geocode(city, state):
+    """
+    Look up a US city/state on geocode.xyz, raising requests.RequestException on failure.
+    Goes through the shared cache so concurrent lookups of one place share a fetch.
+    """
+    params = geocode_params(city, state)
+    req_url = f"{GEOCODE_URL}/?{requests.utils.unquote(requests.compat.urlencode(params))}"
+    with pooled_session() as session:
+        resp = session.get(req_url)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def outlook_params(latitude, longitude):
+    return {
+        "lon": longitude,
+        "lat": latitude,
+        "last": "0",
+        "day": "1",
+        "cat": "categorical"
+    }
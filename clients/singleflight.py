@@ -0,0 +1,155 @@
+import asyncio
+import os
+import threading
+import time
+import zlib
+from contextlib import asynccontextmanager, contextmanager
+
+import requests_cache
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to coalescing within one process only
+    fcntl = None
+
+# Keys are hashed onto a fixed set of lock files so the lock directory stays bounded
+LOCK_STRIPES = 256
+
+# How often an async waiter re-checks a lock held by another process
+ASYNC_POLL_SECONDS = 0.05
+
+_registry_lock = threading.Lock()
+_key_locks = {}
+
+
+def _lock_path(lock_dir, key):
+    os.makedirs(lock_dir, exist_ok=True)
+    # crc32 rather than hash(): str hashing is randomized per process
+    stripe = zlib.crc32(key.encode()) % LOCK_STRIPES
+    return os.path.join(lock_dir, f"{stripe:03d}.lock")
+
+
+@contextmanager
+def _thread_lock(key):
+    """
+    Per-key lock shared by every thread in this process, dropped once nobody holds it
+    """
+    with _registry_lock:
+        entry = _key_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _registry_lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _key_locks[key]
+
+
+@contextmanager
+def single_flight(key, lock_dir):
+    """
+    Hold the single-flight lock for `key` across threads and processes.
+
+    The caller checks the cache inside the lock: the first caller misses and
+    fetches, every caller that was waiting on the same key then finds the
+    response the first one stored.
+    """
+    with _thread_lock(key):
+        if fcntl is None:
+            yield
+            return
+        with open(_lock_path(lock_dir, key), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@asynccontextmanager
+async def async_single_flight(key, lock_dir, inflight):
+    """
+    asyncio counterpart of single_flight().
+
+    Tasks in one event loop coalesce on an asyncio.Lock kept in `inflight`;
+    the file lock is polled without blocking so waiting on another process
+    does not tie up a thread.
+    """
+    entry = inflight.setdefault(key, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            if fcntl is None:
+                yield
+                return
+            with open(_lock_path(lock_dir, key), "a") as lock_file:
+                while True:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        await asyncio.sleep(ASYNC_POLL_SECONDS)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del inflight[key]
+
+
+class SingleFlightSession(requests_cache.CachedSession):
+    """
+    CachedSession that lets only one thread or process download a given uncached request.
+
+    Concurrent identical requests wait for the in-flight one and are then served
+    from the cache instead of each going upstream.
+    """
+
+    def __init__(self, cache_name, *args, lock_dir=None, expire_after_for=None, on_response=None, timeout=None,
+                 **kwargs):
+        """
+        expire_after_for(request) may return a per-request expiration (None keeps the session default).
+        on_response(session, key, response) is called after every request, cached or not.
+        timeout is the default seconds to wait for the first response bytes, as retry_requests.TSession does.
+        """
+        super().__init__(cache_name, *args, **kwargs)
+        self.lock_dir = lock_dir or f"{cache_name}.locks"
+        self.expire_after_for = expire_after_for
+        self.on_response = on_response
+        self.timeout = timeout
+
+    def request(self, method, url, *args, **kwargs):
+        if self.timeout is not None:
+            kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, *args, **kwargs)
+
+    def send(self, request, **kwargs):
+        key = self.cache.create_key(request)
+        if self.expire_after_for and kwargs.get("expire_after") is None:
+            kwargs["expire_after"] = self.expire_after_for(request)
+
+        # Fresh cache entry: nothing to coalesce, skip the locks entirely. An expired
+        # entry takes the lock, so only one caller revalidates it.
+        if self._is_fresh(key):
+            response = super().send(request, **kwargs)
+        else:
+            with single_flight(key, self.lock_dir):
+                response = super().send(request, **kwargs)
+
+        if self.on_response:
+            self.on_response(self, key, response)
+        return response
+
+    def _is_fresh(self, key):
+        """
+        Whether key is cached and unexpired, read from the expires column without
+        deserializing the response (cache.contains() ignores expiry)
+        """
+        responses = self.cache.responses
+        with responses.connection() as con:
+            row = con.execute(f"SELECT expires FROM {responses.table_name} WHERE key = ?", (key,)).fetchone()
+        return row is not None and (row[0] is None or row[0] > time.time())
@@ -1,3 +1,5 @@
+import sys
+
 from trends.dewpointplotter import dewpointplotter
 from trends.dewtrendplotter import dewtrendplotter
 from trends.precippointplotter import precippointplotter
@@ -5,6 +7,7 @@ from trends.preciptrendplotter import preciptrendplotter
 from trends.temppointplotter import temppointplotter
 from trends.temptrendplotter import temptrendplotter
 from outlooks.outlookarchives import outlookarchives
+from server.weatherserver import main as servermain
 from rich.console import Console
 
 console = Console()
@@ -55,4 +58,8 @@ def main():
         exit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # python main.py serve [--host HOST] [--port PORT] runs the HTTP service instead of the menu
+    if sys.argv[1:2] == ["serve"]:
+        servermain(sys.argv[2:])
+    else:
+        main()
\ No newline at end of file
@@ -1,21 +1,17 @@
-import os
-
 import requests
-from datetime import datetime, timedelta
+from datetime import datetime
 
-from dotenv import load_dotenv
-from tabulate import tabulate
+import pandas as pd
 from dateutil import parser
 import pytz
 from collections import Counter
 
-load_dotenv()
-
-authkey = os.getenv("APIKEY")
+from clients.sessions import OUTLOOK_URL, cached_session, geocode, outlook_params
+from reports.summary import export, print_table
 
 def fetch_json_data(url):
     try:
-        response = requests.get(url)
+        response = cached_session().get(url)
         response.raise_for_status()
         return response.json()
     except requests.RequestException as e:
@@ -92,30 +88,35 @@ def filter_outlooks_by_time_range(outlooks, start_date=None, end_date=None, thre
     return filtered_outlooks
 
 
+OUTLOOK_HEADERS = ['Threshold', 'Category', 'Local Issue Date', 'Local Expire Date', 'Local Product Issue Date']
+
+
+def outlook_row(outlook):
+    """
+    Table cells for one outlook, with dates in local time
+    """
+    return [
+        outlook['threshold'],
+        outlook['category'],
+        format_utc_date(outlook['utc_issue']),
+        format_utc_date(outlook['utc_expire']),
+        format_utc_date(outlook['utc_product_issue'])
+    ]
+
+
 def outlookarchives():
     # URL from the provided link
     print("Enter a location\n")
     city = input("Enter City: ")
     state = input("Enter State: ")
 
-    base_url = "https://geocode.xyz"
-    params = {
-        "locate": (city + " " + state),
-        "region": "US",
-        "json": "1"
-    }
-
-    req_url = f"{base_url}/?{requests.utils.unquote(requests.compat.urlencode(params))}"
     try:
-        resp = requests.get(req_url + f"&auth={authkey}")
-        resp.raise_for_status()
+        geocode_data = geocode(city, state)
     except requests.RequestException as err:
         print("Error:", err)
         exit()
 
-    geocode_data = resp.json()
-
-    url = f"https://mesonet.agron.iastate.edu/json/spcoutlook.py?lon={geocode_data['longt']}&lat={geocode_data['latt']}&last=0&day=1&cat=categorical"
+    url = f"{OUTLOOK_URL}?{requests.compat.urlencode(outlook_params(geocode_data['latt'], geocode_data['longt']))}"
 
     # Fetch the data
     json_data = fetch_json_data(url)
@@ -137,27 +138,16 @@ def outlookarchives():
             threshold=threshold
         )
 
-        # Prepare data for display
-        display_data = [
-            [
-                outlook['threshold'],
-                outlook['category'],
-                format_utc_date(outlook['utc_issue']),
-                format_utc_date(outlook['utc_expire']),
-                format_utc_date(outlook['utc_product_issue'])
-            ]
-            for outlook in filtered_outlooks
-        ]
-
-        # Print results
-        if display_data:
+        # Print results. Rows are formatted a page at a time, so a long history
+        # costs no more to show than the first page
+        if filtered_outlooks:
 
             print("\nFiltered Outlooks:")
-            print(tabulate(
-                display_data,
-                headers=['Threshold', 'Category', 'Local Issue Date', 'Local Expire Date', 'Local Product Issue Date'],
-                tablefmt='fancy_grid'
-            ))
+            print_table(
+                filtered_outlooks,
+                headers=OUTLOOK_HEADERS,
+                format_row=outlook_row
+            )
 
             # Count thresholds
             threshold_counts = Counter(outlook['threshold'] for outlook in filtered_outlooks)
@@ -168,6 +158,15 @@ def outlookarchives():
                 print(f"{threshold}: {count}")
 
             # Total count
-            print(f"\nTotal Outlooks: {len(filtered_outlooks)}\n\n")
+            print(f"\nTotal Outlooks: {len(filtered_outlooks)}\n")
+
+            # Optional full export, since only the first pages are printed
+            export_path = input("Export outlooks to a .csv or .json file (or press Enter to skip): ").strip()
+            if export_path:
+                try:
+                    export(pd.DataFrame.from_records(filtered_outlooks), export_path)
+                    print(f"Wrote {len(filtered_outlooks)} outlooks to {export_path}\n\n")
+                except (ValueError, OSError) as err:
+                    print("Error:", err)
         else:
             print("No outlooks found in the specified date range.")
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+SPC Day 1 convective outlook climatology for many sites.
+
+Fetches the IEM outlook history for every site concurrently, then computes with
+vectorized group-bys:
+  - outlook days per threshold per month and per season
+  - longest run of consecutive days at or above each threshold
+  - outlook days per threshold per year, with a least-squares trend in days/year
+
+    python -m outlooks.outlookstats sites.csv --out climatology [--format csv|parquet]
+
+sites.csv needs site, latitude and longitude columns. One file per table is
+written: <out>_monthly, <out>_seasonal, <out>_streaks, <out>_yearly, <out>_trends.
+CSV is the default; parquet output needs pyarrow (or fastparquet) installed.
+"""
+import argparse
+import asyncio
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+from clients.asyncclient import AsyncClient
+
+# Categorical thresholds from least to most severe
+THRESHOLD_ORDER = ["TSTM", "MRGL", "SLGT", "ENH", "MDT", "HIGH"]
+
+# Meteorological seasons, indexed by month - 1
+SEASONS = np.array(["DJF", "DJF", "MAM", "MAM", "MAM", "JJA", "JJA", "JJA", "SON", "SON", "SON", "DJF"])
+
+# Day 1 outlooks run 12Z to 12Z, so an 01Z update belongs to the previous convective day
+CONVECTIVE_DAY_OFFSET = pd.Timedelta(hours=12)
+
+
+def outlook_frame(outlooks, site):
+    """
+    Flatten one site's IEM outlook list into a DataFrame with parsed UTC timestamps
+    """
+    frame = pd.DataFrame.from_records(outlooks, columns=["threshold", "category", "utc_issue", "utc_expire"])
+    frame["site"] = site
+    frame["utc_issue"] = pd.to_datetime(frame["utc_issue"], utc=True, format="ISO8601")
+    frame["utc_expire"] = pd.to_datetime(frame["utc_expire"], utc=True, format="ISO8601")
+    return frame
+
+
+def outlook_days(frame):
+    """
+    Reduce outlook rows to one row per site and convective day, keeping the highest threshold issued
+    """
+    level = pd.Categorical(frame["threshold"], categories=THRESHOLD_ORDER, ordered=True).codes
+    days = pd.DataFrame({
+        "site": frame["site"].to_numpy(),
+        "day": (frame["utc_issue"] - CONVECTIVE_DAY_OFFSET).dt.tz_convert(None).dt.normalize().to_numpy(),
+        "level": level
+    })
+    # Unknown thresholds get code -1 and are dropped
+    days = days[days["level"] >= 0]
+    days = days.groupby(["site", "day"], sort=True, as_index=False)["level"].max()
+    days["threshold"] = pd.Categorical.from_codes(days["level"], categories=THRESHOLD_ORDER, ordered=True)
+    return days
+
+
+def monthly_counts(days):
+    """
+    Outlook days per site, threshold and calendar month
+    """
+    return (days.assign(month=days["day"].dt.month)
+            .groupby(["site", "threshold", "month"], observed=True).size()
+            .rename("days").reset_index())
+
+
+def seasonal_counts(days):
+    return (days.assign(season=SEASONS[days["day"].dt.month.to_numpy() - 1])
+            .groupby(["site", "threshold", "season"], observed=True).size()
+            .rename("days").reset_index())
+
+
+def longest_streaks(days):
+    """
+    Longest run of consecutive convective days at or above each threshold, per site
+    """
+    rows = []
+    for level, threshold in enumerate(THRESHOLD_ORDER):
+        at_or_above = days.loc[days["level"] >= level, ["site", "day"]]
+        if at_or_above.empty:
+            continue
+        # A new run starts whenever the site changes or the gap to the previous day is not one day
+        gap = at_or_above["day"].diff() != pd.Timedelta(days=1)
+        new_site = at_or_above["site"] != at_or_above["site"].shift()
+        run_id = (gap | new_site).cumsum()
+        runs = at_or_above.groupby(run_id).agg(site=("site", "first"), start=("day", "first"), length=("day", "size"))
+        best = runs.loc[runs.groupby("site")["length"].idxmax()]
+        rows.append(best.assign(threshold=threshold))
+
+    if not rows:
+        return pd.DataFrame(columns=["site", "threshold", "start", "length"])
+    return pd.concat(rows, ignore_index=True)[["site", "threshold", "start", "length"]]
+
+
+def yearly_counts(days):
+    return (days.assign(year=days["day"].dt.year)
+            .groupby(["site", "threshold", "year"], observed=True).size()
+            .rename("days").reset_index())
+
+
+def yearly_trends(yearly):
+    """
+    Least-squares slope of outlook days per year for each site and threshold.
+    Years with no outlook day at a threshold count as zero rather than being skipped.
+    """
+    if yearly.empty:
+        return pd.DataFrame(columns=["site", "threshold", "years", "days_per_year"])
+
+    years = np.arange(yearly["year"].min(), yearly["year"].max() + 1)
+    table = (yearly.pivot_table(index=["site", "threshold"], columns="year", values="days",
+                                fill_value=0, observed=True)
+             .reindex(columns=years, fill_value=0))
+    centered = years - years.mean()
+    spread = centered @ centered
+    slope = table.to_numpy() @ centered / spread if spread else np.full(len(table), np.nan)
+    return pd.DataFrame({"years": len(years), "days_per_year": slope}, index=table.index).reset_index()
+
+
+def climatology(frame):
+    """
+    All climatology tables for a multi-site outlook frame, keyed by table name
+    """
+    days = outlook_days(frame)
+    yearly = yearly_counts(days)
+    return {
+        "monthly": monthly_counts(days),
+        "seasonal": seasonal_counts(days),
+        "streaks": longest_streaks(days),
+        "yearly": yearly,
+        "trends": yearly_trends(yearly)
+    }
+
+
+async def _fetch_sites(sites):
+    async with AsyncClient() as client:
+        results = await asyncio.gather(
+            *(client.outlooks(latitude, longitude) for _, latitude, longitude in sites),
+            return_exceptions=True
+        )
+    frames = []
+    for (site, _, _), result in zip(sites, results):
+        if isinstance(result, Exception):
+            print(f"Error fetching outlooks for {site}: {result}")
+            continue
+        frames.append(outlook_frame(result["outlooks"], site))
+    return frames
+
+
+def fetch_sites(sites):
+    """
+    Outlook frame for a list of (site, latitude, longitude) tuples, fetched concurrently
+    """
+    frames = asyncio.run(_fetch_sites(sites))
+    if not frames:
+        return outlook_frame([], None)
+    return pd.concat(frames, ignore_index=True)
+
+
+def parquet_available():
+    """
+    Whether pandas has a parquet engine to write with
+    """
+    return any(importlib.util.find_spec(engine) for engine in ("pyarrow", "fastparquet"))
+
+
+def export(tables, out, fmt="csv"):
+    for name, table in tables.items():
+        path = f"{out}_{name}.{fmt}"
+        if fmt == "parquet":
+            table.to_parquet(path, index=False)
+        else:
+            table.to_csv(path, index=False)
+        print(f"Wrote {path} ({len(table)} rows)")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog="python -m outlooks.outlookstats",
+                                         description="SPC outlook climatology for many sites")
+    arg_parser.add_argument("sites", help="CSV with site, latitude and longitude columns")
+    arg_parser.add_argument("--out", default="outlook_climatology", help="output path prefix")
+    arg_parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    args = arg_parser.parse_args()
+    # Checked up front so a missing engine doesn't surface after every site has been fetched
+    if args.format == "parquet" and not parquet_available():
+        arg_parser.error("--format parquet needs pyarrow or fastparquet installed")
+
+    sites = pd.read_csv(args.sites)
+    frame = fetch_sites(list(sites[["site", "latitude", "longitude"]].itertuples(index=False, name=None)))
+    export(climatology(frame), args.out, args.format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import sys
+
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+# Rows rendered per page; only rows on pages actually shown are ever formatted
+PAGE_SIZE = 25
+
+
+def series_summary(values):
+    """
+    Count, min, max and mean of a value array, ignoring NaN
+    """
+    values = np.asarray(values)
+    count = int(np.count_nonzero(~np.isnan(values)))
+    if count == 0:
+        return {"count": 0, "min": None, "max": None, "mean": None}
+    return {
+        "count": count,
+        "min": float(np.nanmin(values)),
+        "max": float(np.nanmax(values)),
+        # Accumulate in float64 so long float32 series don't lose precision
+        "mean": float(np.nanmean(values, dtype=np.float64))
+    }
+
+
+def print_series_summary(hourly_dataframe, column, unit=""):
+    """
+    Print a fixed-size summary of an hourly series instead of the whole DataFrame
+    """
+    summary = series_summary(hourly_dataframe[column].to_numpy())
+    dates = hourly_dataframe['date']
+
+    table = Table(title=f"{column} summary", show_header=False)
+    if len(dates):
+        table.add_row("Period", f"{dates.iloc[0].strftime('%Y-%m-%d %H:%M')} to {dates.iloc[-1].strftime('%Y-%m-%d %H:%M')}")
+    table.add_row("Count", f"{summary['count']:,}")
+    for name in ("min", "max", "mean"):
+        value = summary[name]
+        table.add_row(name.capitalize(), "n/a" if value is None else f"{value:.2f}{unit}")
+    console.print(table)
+
+
+def print_table(items, headers, format_row=None, page_size=PAGE_SIZE, interactive=None):
+    """
+    Print items as a rich table one page at a time.
+
+    format_row turns an item into a row of cells and is only called for rows that
+    are displayed. On a terminal the user pages through with Enter; when stdout is
+    redirected only the first page is written, so log output stays bounded.
+    """
+    format_row = format_row or (lambda item: item)
+    interactive = sys.stdout.isatty() if interactive is None else interactive
+    total = len(items)
+
+    for start in range(0, total, page_size):
+        table = Table(*headers)
+        for item in items[start:start + page_size]:
+            table.add_row(*(str(cell) for cell in format_row(item)))
+        console.print(table)
+
+        shown = min(start + page_size, total)
+        if shown >= total:
+            break
+        if not interactive:
+            console.print(f"... {total - shown:,} more rows not shown (export to CSV/JSON for the full table)")
+            break
+        if input(f"Showing {shown:,} of {total:,}. Press Enter for more or q to stop: ").strip().lower() == "q":
+            break
+
+
+def export(frame, path):
+    """
+    Write a DataFrame to .csv or .json (records), chosen by the file extension
+    """
+    if path.endswith(".csv"):
+        frame.to_csv(path, index=False)
+    elif path.endswith(".json"):
+        frame.to_json(path, orient="records", date_format="iso")
+    else:
+        raise ValueError(f"Unsupported export format for {path}, use .csv or .json")
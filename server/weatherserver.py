@@ -0,0 +1,271 @@
+"""
+Long-running local HTTP service for the trend, plot and outlook analyses.
+
+    python main.py serve [--host 127.0.0.1] [--port 8000]
+
+    GET /trend/{variable}?city=Denver&state=CO&start=2020-01-01&end=2024-12-31[&format=png|svg|json]
+    GET /plot/{variable}?city=Denver&state=CO&start=2024-06-01&end=2024-06-30[&format=png|svg|json]
+    GET /outlooks?city=Denver&state=CO[&start=2024-03-01&end=2024-06-01&threshold=MRGL]
+
+variable is one of temperature, precipitation, dewpoint. The process keeps its
+imports, pooled sessions, decoded series and rendered images warm, so a repeated
+query is answered from memory.
+"""
+import argparse
+import json
+import time
+from collections import Counter
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+import pytz
+import requests
+from dateutil import parser
+from openmeteo_requests.Client import OpenMeteoRequestsError
+
+from clients.chunkedarchive import fetch_archive
+from clients.sessions import OUTLOOK_EXPIRE_AFTER, OUTLOOK_URL, geocode, outlook_params, pooled_session
+from outlooks.outlookarchives import filter_outlooks_by_time_range
+from trends.artifactcache import artifact_key, data_version, get_or_render, pack_arrays, unpack_arrays
+from trends.charts import point_chart, trend_chart
+from trends.hourlyseries import daily_mean, hourly_frame, smooth_trend
+from trends.variables import VARIABLES, archive_params
+
+# Entries held by the in-memory LRUs
+SERIES_CACHE_SIZE = 64
+IMAGE_CACHE_SIZE = 256
+
+CONTENT_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "json": "application/json"
+}
+
+
+class BadRequest(Exception):
+    pass
+
+
+@lru_cache(maxsize=SERIES_CACHE_SIZE)
+def location(city, state):
+    geocode_data = geocode(city, state)
+    if 'latt' not in geocode_data:
+        raise BadRequest(f"Could not geocode {city} {state}")
+    return geocode_data['latt'], geocode_data['longt']
+
+
+@lru_cache(maxsize=SERIES_CACHE_SIZE)
+def hourly_series(variable, city, state, start_date, end_date, version):
+    """
+    Decoded hourly (dates, values) for a query. Shared between requests, so treat as read-only.
+    version is data_version(end_date), so a range over recent days is refetched once per
+    revalidation window instead of being held for the life of the process.
+    """
+    latitude, longitude = location(city, state)
+    params = archive_params(variable, latitude, longitude, start_date, end_date)
+    _, hourly_dataframe = fetch_archive(params, VARIABLES[variable]["hourly"])
+    return hourly_dataframe['date'], hourly_dataframe[VARIABLES[variable]["hourly"]].to_numpy()
+
+
+@lru_cache(maxsize=SERIES_CACHE_SIZE)
+def trend_series(variable, city, state, start_date, end_date, version):
+    """
+    Daily (dates, means, trend) for a query. Served from the artifact cache when
+    possible, otherwise derived from the hourly series and stored there.
+    """
+    def compute():
+        dates, values = hourly_series(variable, city, state, start_date, end_date, version)
+        daily_data = daily_mean(hourly_frame(dates, values, 'value'))
+        trend = smooth_trend(daily_data['value'], 14, 3)
+        return pack_arrays(dates=daily_data['date'].dt.tz_convert(None).to_numpy(),
+                           daily=daily_data['value'].to_numpy(), trend=trend)
+
+    key = artifact_key("trend-arrays", variable=variable, city=city, state=state, start=start_date,
+                       end=end_date, data=version)
+    arrays = unpack_arrays(get_or_render(key, compute))
+    return pd.DatetimeIndex(arrays["dates"]).tz_localize("UTC"), arrays["daily"], arrays["trend"]
+
+
+@lru_cache(maxsize=IMAGE_CACHE_SIZE)
+def rendered(kind, variable, city, state, start_date, end_date, fmt, version):
+    """
+    Chart bytes for a query. A stored artifact is returned as-is, without touching
+    pandas or matplotlib.
+    """
+    def render():
+        if kind == "trend":
+            dates, _, trend = trend_series(variable, city, state, start_date, end_date, version)
+            return trend_chart(dates, trend, variable, city, state, fmt)
+        dates, values = hourly_series(variable, city, state, start_date, end_date, version)
+        return point_chart(dates, values, variable, city, state, fmt)
+
+    key = artifact_key("chart", chart=kind, variable=variable, city=city, state=state, start=start_date,
+                       end=end_date, style=fmt, data=version)
+    return get_or_render(key, render)
+
+
+def _json_values(values):
+    # NaN is not valid JSON
+    return [None if value != value else value for value in np.asarray(values, dtype=float).tolist()]
+
+
+def _json_dates(dates):
+    return [date.isoformat() for date in dates]
+
+
+def trend_json(variable, city, state, start_date, end_date, version):
+    dates, daily, trend = trend_series(variable, city, state, start_date, end_date, version)
+    return {
+        "variable": variable,
+        "unit": VARIABLES[variable]["unit"],
+        "location": {"city": city, "state": state},
+        "dates": _json_dates(dates),
+        "daily_mean": _json_values(daily),
+        "trend": _json_values(trend)
+    }
+
+
+def plot_json(variable, city, state, start_date, end_date, version):
+    dates, values = hourly_series(variable, city, state, start_date, end_date, version)
+    return {
+        "variable": variable,
+        "unit": VARIABLES[variable]["unit"],
+        "location": {"city": city, "state": state},
+        "dates": _json_dates(dates),
+        "values": _json_values(values)
+    }
+
+
+def _outlook_date(value):
+    if not value:
+        return None
+    try:
+        return parser.parse(value).replace(tzinfo=pytz.UTC)
+    except ValueError:
+        raise BadRequest(f"Invalid date: {value}")
+
+
+def outlook_window():
+    """
+    Current OUTLOOK_EXPIRE_AFTER-sized time bucket. Passed into the outlook LRUs so
+    an in-memory entry is replaced at least once per cache TTL.
+    """
+    return int(time.time() // OUTLOOK_EXPIRE_AFTER.total_seconds())
+
+
+@lru_cache(maxsize=SERIES_CACHE_SIZE)
+def outlook_history(latitude, longitude, window):
+    """
+    Parsed IEM outlook list for a location. Shared between requests, so treat as read-only.
+    """
+    with pooled_session() as session:
+        resp = session.get(OUTLOOK_URL, params=outlook_params(latitude, longitude))
+    resp.raise_for_status()
+    return resp.json()['outlooks']
+
+
+@lru_cache(maxsize=IMAGE_CACHE_SIZE)
+def outlooks_body(city, state, start, end, threshold, window):
+    """
+    Encoded /outlooks response, so a repeated query skips filtering and serialization
+    """
+    latitude, longitude = location(city, state)
+    filtered_outlooks = filter_outlooks_by_time_range(
+        outlook_history(latitude, longitude, window),
+        start_date=_outlook_date(start),
+        end_date=_outlook_date(end),
+        threshold=threshold
+    )
+    return json.dumps({
+        "location": {"city": city, "state": state},
+        "outlooks": filtered_outlooks,
+        "threshold_counts": dict(Counter(outlook['threshold'] for outlook in filtered_outlooks)),
+        "total": len(filtered_outlooks)
+    }).encode()
+
+
+class WeatherRequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+
+        try:
+            if parts == ["outlooks"]:
+                city, state = self._require(query, "city", "state")
+                body = outlooks_body(city, state, query.get("start"), query.get("end"), query.get("threshold"),
+                                     outlook_window())
+                self._send(200, "json", body)
+            elif len(parts) == 2 and parts[0] in ("trend", "plot"):
+                self._send_analysis(parts[0], parts[1], query)
+            else:
+                self._send_error(404, f"Unknown path {url.path}")
+        except BadRequest as err:
+            self._send_error(400, str(err))
+        except (requests.RequestException, OpenMeteoRequestsError) as err:
+            self._send_error(502, f"Upstream request failed: {err}")
+
+    def _send_analysis(self, kind, variable, query):
+        if variable not in VARIABLES:
+            raise BadRequest(f"Unknown variable {variable}, expected one of {', '.join(VARIABLES)}")
+        city, state, start_date, end_date = self._require(query, "city", "state", "start", "end")
+        fmt = query.get("format", "png")
+        if fmt not in CONTENT_TYPES:
+            raise BadRequest(f"Unknown format {fmt}, expected one of {', '.join(CONTENT_TYPES)}")
+
+        # Part of every in-memory key, so entries over recent days expire with the HTTP cache
+        version = data_version(end_date)
+        try:
+            if fmt == "json":
+                to_json = trend_json if kind == "trend" else plot_json
+                body = json.dumps(to_json(variable, city, state, start_date, end_date, version)).encode()
+            else:
+                body = rendered(kind, variable, city, state, start_date, end_date, fmt, version)
+        except ValueError as err:
+            # Malformed or reversed dates
+            raise BadRequest(str(err))
+        self._send(200, fmt, body)
+
+    @staticmethod
+    def _require(query, *names):
+        missing = [name for name in names if not query.get(name)]
+        if missing:
+            raise BadRequest(f"Missing query parameter(s): {', '.join(missing)}")
+        return [query[name] for name in names]
+
+    def _send(self, status, fmt, body):
+        self.send_response(status)
+        self.send_header("Content-Type", CONTENT_TYPES[fmt])
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        self._send(status, "json", json.dumps({"error": message}).encode())
+
+
+def serve(host="127.0.0.1", port=8000):
+    httpd = ThreadingHTTPServer((host, port), WeatherRequestHandler)
+    print(f"Serving on http://{host}:{port}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(prog="python main.py serve", description="Serve trend plots and JSON over HTTP")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8000)
+    args = arg_parser.parse_args(argv)
+    serve(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from trends.hourlyseries import SERIES_DTYPE, hourly_frame, daily_mean, smooth_trend
+
+
+def station_from_response(response):
+    """
+    Reduce an Open-Meteo response to the (start, interval, values) tuple the pool works on
+    """
+    hourly = response.Hourly()
+    return hourly.Time(), hourly.Interval(), hourly.Variables(0).ValuesAsNumpy()
+
+
+def analyze_station(start, interval, values, window_size=14, polyorder=3):
+    """
+    Daily average and smoothed trend for one station's hourly values.
+    Daily dates come back as int64 UTC epoch seconds, which pickle as one
+    buffer rather than an object array of Timestamps.
+    """
+    dates = pd.date_range(
+        start=pd.to_datetime(start, unit="s", utc=True),
+        periods=len(values),
+        freq=pd.Timedelta(seconds=interval)
+    )
+    daily_data = daily_mean(hourly_frame(dates, values, "value"))
+    trend = smooth_trend(daily_data['value'], window_size, polyorder)
+    daily_dates = pd.DatetimeIndex(daily_data['date']).as_unit("s").asi8
+    return daily_dates, daily_data['value'].to_numpy(), trend
+
+
+def _analyze_batch(shm_name, total, batch, window_size, polyorder):
+    """
+    Worker entry point: attach to the shared block and analyze a batch of stations
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    packed = np.ndarray((total,), dtype=SERIES_DTYPE, buffer=shm.buf)
+    try:
+        results = [
+            analyze_station(start, interval, packed[offset:offset + length], window_size, polyorder)
+            for start, interval, offset, length in batch
+        ]
+    finally:
+        # Drop the view before closing or the buffer export keeps the mapping alive
+        del packed
+        shm.close()
+    return results
+
+
+def analyze_stations(stations, workers=None, window_size=14, polyorder=3):
+    """
+    Run the daily average + smoothing stage for many stations across a process pool.
+
+    stations is a list of (start, interval, values) tuples as returned by
+    station_from_response(). The hourly values are packed once into a single
+    shared memory block, so workers only receive offsets instead of pickled arrays.
+    Returns a list of (daily_dates, daily_values, trend) in the same order, with
+    daily_dates as int64 UTC epoch seconds.
+    """
+    if not stations:
+        return []
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [analyze_station(start, interval, values, window_size, polyorder)
+                for start, interval, values in stations]
+
+    lengths = [len(values) for _, _, values in stations]
+    total = sum(lengths)
+    shm = shared_memory.SharedMemory(create=True, size=max(total, 1) * np.dtype(SERIES_DTYPE).itemsize)
+    try:
+        packed = np.ndarray((total,), dtype=SERIES_DTYPE, buffer=shm.buf)
+        layout = []
+        offset = 0
+        for (start, interval, values), length in zip(stations, lengths):
+            packed[offset:offset + length] = values
+            layout.append((start, interval, offset, length))
+            offset += length
+        del packed
+
+        # A few batches per worker keeps submission overhead low while still balancing load
+        batch_size = max(1, len(layout) // (workers * 4))
+        batches = [layout[i:i + batch_size] for i in range(0, len(layout), batch_size)]
+
+        results = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_analyze_batch, shm.name, total, batch, window_size, polyorder)
+                       for batch in batches]
+            for future in futures:
+                results.extend(future.result())
+        return results
+    finally:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,147 @@
+"""
+Area mode: a size x size lat/lon grid around a city, fetched as one
+multi-coordinate archive request per year and reduced with vectorized NumPy.
+
+    python -m trends.areagrid --city Denver --state CO --variable temperature \\
+        --start 2020-01-01 --end 2024-12-31 [--size 10] [--spacing 0.1] [--out denver]
+
+Writes <out>_area.png (daily area mean with the min-max band) and
+<out>_heatmap.png (mean per grid point over the period).
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+import requests
+from openmeteo_requests.Client import OpenMeteoRequestsError
+
+from clients.chunkedarchive import fetch_grid_archive
+from clients.sessions import geocode
+from reports.summary import print_series_summary
+from trends.charts import area_chart, heatmap_chart
+from trends.hourlyseries import SERIES_DTYPE, hourly_frame
+from trends.variables import VARIABLES, archive_params
+
+GRID_SIZE = 10
+
+# Degrees between grid points, about 11 km in latitude (ERA5-Land resolution)
+GRID_SPACING = 0.1
+
+
+def grid_axes(latitude, longitude, size=GRID_SIZE, spacing=GRID_SPACING):
+    """
+    Latitudes and longitudes of a size x size grid centred on a point
+    """
+    offsets = (np.arange(size) - (size - 1) / 2) * spacing
+    return np.round(latitude + offsets, 4), np.round(longitude + offsets, 4)
+
+
+def grid_params(variable, latitudes, longitudes, start_date, end_date):
+    """
+    Archive parameters requesting every grid point at once, row by row (latitude-major)
+    """
+    grid_latitudes, grid_longitudes = np.meshgrid(latitudes, longitudes, indexing="ij")
+    return archive_params(
+        variable,
+        ",".join(map(str, grid_latitudes.ravel())),
+        ",".join(map(str, grid_longitudes.ravel())),
+        start_date,
+        end_date
+    )
+
+
+def area_stats(values):
+    """
+    Mean, min and max across grid points for each time step of a (points, hours) array.
+    Points with no data at a time step are ignored; a step with no data anywhere is NaN.
+    """
+    with warnings.catch_warnings():
+        # Steps missing at every point are expected at the ragged end of the archive
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(values, axis=0, dtype=np.float64).astype(values.dtype)
+        low = np.nanmin(values, axis=0)
+        high = np.nanmax(values, axis=0)
+    return mean, low, high
+
+
+def daily_area_stats(area_dataframe):
+    """
+    One row per day of the hourly area mean, min and max: the mean is averaged,
+    while the band takes the lowest min and highest max of the day
+    """
+    daily_data = area_dataframe.resample('D', on='date').agg({"mean": "mean", "min": "min", "max": "max"})
+    return daily_data.astype(SERIES_DTYPE, copy=False).reset_index()
+
+
+def point_means(values, size):
+    """
+    Mean of each grid point over the whole period, as a size x size latitude-major grid
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmean(values, axis=1, dtype=np.float64).reshape(size, size)
+
+
+def fetch_area(variable, latitude, longitude, start_date, end_date, size=GRID_SIZE, spacing=GRID_SPACING):
+    """
+    Fetch the grid around a point. Returns (latitudes, longitudes, dates, values)
+    where values has shape (size * size, hours), latitude-major.
+    """
+    latitudes, longitudes = grid_axes(latitude, longitude, size, spacing)
+    params = grid_params(variable, latitudes, longitudes, start_date, end_date)
+    _, dates, values = fetch_grid_archive(params, size * size)
+    return latitudes, longitudes, dates, values
+
+
+def area_mode(city, state, variable, start_date, end_date, size=GRID_SIZE, spacing=GRID_SPACING, out=None):
+    geocode_data = geocode(city, state)
+    latitude, longitude = float(geocode_data['latt']), float(geocode_data['longt'])
+
+    began = time.perf_counter()
+    latitudes, longitudes, dates, values = fetch_area(variable, latitude, longitude, start_date, end_date,
+                                                      size, spacing)
+    print(f"Fetched {size}x{size} grid, {values.shape[1]:,} hours, in {time.perf_counter() - began:.2f}s")
+
+    mean, low, high = area_stats(values)
+    area_dataframe = hourly_frame(dates, mean, "mean")
+    area_dataframe["min"] = low
+    area_dataframe["max"] = high
+    print_series_summary(area_dataframe, "mean", VARIABLES[variable]["unit"])
+
+    daily_data = daily_area_stats(area_dataframe)
+
+    out = out or f"{city}_{state}_{variable}".replace(" ", "_")
+    charts = {
+        f"{out}_area.png": area_chart(daily_data['date'], daily_data['mean'], daily_data['min'], daily_data['max'],
+                                      variable, city, state),
+        f"{out}_heatmap.png": heatmap_chart(latitudes, longitudes, point_means(values, size), variable, city, state)
+    }
+    for path, data in charts.items():
+        with open(path, "wb") as chart:
+            chart.write(data)
+        print(f"Wrote {path}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog="python -m trends.areagrid",
+                                         description="Area mean, min and max over a grid around a city")
+    arg_parser.add_argument("--city", required=True)
+    arg_parser.add_argument("--state", required=True)
+    arg_parser.add_argument("--variable", choices=list(VARIABLES), default="temperature")
+    arg_parser.add_argument("--start", required=True, help="YYYY-MM-DD")
+    arg_parser.add_argument("--end", required=True, help="YYYY-MM-DD")
+    arg_parser.add_argument("--size", type=int, default=GRID_SIZE, help="grid points per side")
+    arg_parser.add_argument("--spacing", type=float, default=GRID_SPACING, help="degrees between grid points")
+    arg_parser.add_argument("--out", help="output path prefix")
+    args = arg_parser.parse_args()
+
+    try:
+        area_mode(args.city, args.state, args.variable, args.start, args.end, args.size, args.spacing, args.out)
+    except (requests.RequestException, OpenMeteoRequestsError) as err:
+        print("Error:", err)
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Content-addressed on-disk cache for computed trend arrays and rendered charts.
+
+Artifacts are keyed by a hash of their inputs (location, variable, date range,
+style) plus a hash of the code that produces them, so editing the charting or
+smoothing code invalidates old entries automatically. The directory is kept
+under a size budget by evicting the least recently used files.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+
+import matplotlib
+import numpy as np
+
+from clients.sessions import ARCHIVE_SETTLE_DAYS, RECENT_EXPIRE_AFTER
+
+ARTIFACT_DIR = '.artifacts'
+MAX_ARTIFACT_BYTES = 512 * 1024 * 1024
+
+# Eviction trims the directory to this fraction of the budget, so it runs once per
+# batch of writes rather than on every write past the limit
+EVICT_LOW_WATER = 0.9
+
+# Sources whose behaviour is baked into a stored artifact, relative to the repo root
+_VERSIONED_SOURCES = [
+    "trends/hourlyseries.py",
+    "trends/charts.py",
+    "trends/temppointplotter.py",
+    "trends/temptrendplotter.py",
+    "trends/precippointplotter.py",
+    "trends/preciptrendplotter.py",
+    "trends/dewpointplotter.py",
+    "trends/dewtrendplotter.py",
+    "trends/variables.py",
+    "clients/chunkedarchive.py",
+    "server/weatherserver.py"
+]
+
+# artifact_dir -> bytes on disk as last scanned plus what this process has written since
+_dir_bytes = {}
+
+
+def _code_version():
+    digest = hashlib.sha256(matplotlib.__version__.encode())
+    digest.update(np.__version__.encode())
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for name in _VERSIONED_SOURCES:
+        with open(os.path.join(root, name), "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()[:16]
+
+
+CODE_VERSION = _code_version()
+
+
+def data_version(end_date):
+    """
+    'settled' for ranges the archive will no longer revise, otherwise the current
+    revalidation window, so artifacts over recent days age out with the HTTP cache
+    """
+    try:
+        if date.fromisoformat(end_date) <= date.today() - timedelta(days=ARCHIVE_SETTLE_DAYS):
+            return "settled"
+    except ValueError:
+        pass
+    window = int(RECENT_EXPIRE_AFTER.total_seconds())
+    return str(int(datetime.now(timezone.utc).timestamp()) // window)
+
+
+def artifact_key(kind, **inputs):
+    payload = json.dumps({"kind": kind, "code": CODE_VERSION, **inputs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _path(key, artifact_dir):
+    return os.path.join(artifact_dir, key[:2], key)
+
+
+def get(key, artifact_dir=ARTIFACT_DIR):
+    """
+    Stored bytes for a key, or None. A hit refreshes the file's mtime for LRU eviction.
+    """
+    path = _path(key, artifact_dir)
+    try:
+        with open(path, "rb") as artifact:
+            data = artifact.read()
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        # Evicted by another thread or process since the read; the bytes are still good
+        pass
+    return data
+
+
+def put(key, data, artifact_dir=ARTIFACT_DIR, max_bytes=MAX_ARTIFACT_BYTES):
+    """
+    Store bytes under a key, writing atomically so concurrent readers never see a partial file.
+    The directory size is tracked in memory, so eviction only scans when the budget is exceeded.
+    """
+    path = _path(key, artifact_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if artifact_dir not in _dir_bytes:
+        _dir_bytes[artifact_dir] = _scan(artifact_dir)[1]
+    try:
+        replaced = os.path.getsize(path)
+    except FileNotFoundError:
+        replaced = 0
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Otherwise the partial file would count toward the budget until evicted
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    _dir_bytes[artifact_dir] += len(data) - replaced
+    if _dir_bytes[artifact_dir] > max_bytes:
+        evict(artifact_dir, int(max_bytes * EVICT_LOW_WATER))
+
+
+def _scan(artifact_dir):
+    """
+    (mtime, size, path) of every artifact, and their total size
+    """
+    entries = []
+    total = 0
+    if not os.path.isdir(artifact_dir):
+        return entries, total
+    for shard in os.scandir(artifact_dir):
+        if not shard.is_dir():
+            continue
+        for entry in os.scandir(shard.path):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                # Removed by a concurrent eviction
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+    return entries, total
+
+
+def evict(artifact_dir=ARTIFACT_DIR, max_bytes=MAX_ARTIFACT_BYTES):
+    """
+    Delete least recently used artifacts until the directory fits in max_bytes.
+    Rescans the directory, which also corrects the tracked size for writes from other processes.
+    """
+    entries, total = _scan(artifact_dir)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        total -= size
+        removed += 1
+    _dir_bytes[artifact_dir] = total
+    return removed
+
+
+def get_or_render(key, render, artifact_dir=ARTIFACT_DIR):
+    """
+    Return the stored bytes for key, calling render() and storing its bytes on a miss
+    """
+    data = get(key, artifact_dir)
+    if data is None:
+        data = render()
+        put(key, data, artifact_dir)
+    return data
+
+
+def pack_arrays(**arrays):
+    buf = io.BytesIO()
+    np.savez(buf, **arrays)
+    return buf.getvalue()
+
+
+def unpack_arrays(data):
+    with np.load(io.BytesIO(data)) as arrays:
+        return {name: arrays[name] for name in arrays.files}
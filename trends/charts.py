@@ -0,0 +1,93 @@
+import io
+import math
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+from trends import (dewpointplotter, dewtrendplotter, precippointplotter, preciptrendplotter, temppointplotter,
+                    temptrendplotter)
+from trends.hourlyseries import hourly_frame
+from trends.variables import VARIABLES
+
+# Figure objects rather than pyplot: no global state, so charts can be rendered
+# from server threads without a display. The trend and point charts are drawn by
+# the plotters themselves, so the server and the menu actions show the same chart.
+
+# variable -> (point plotter drawing, trend plotter drawing)
+_PLOTTERS = {
+    "temperature": (temppointplotter.plot_hourly, temptrendplotter.plot_trend),
+    "precipitation": (precippointplotter.plot_hourly, preciptrendplotter.plot_trend),
+    "dewpoint": (dewpointplotter.plot_hourly, dewtrendplotter.plot_trend)
+}
+
+
+def _finish(fig, ax, spec, fmt):
+    if spec["freezing_line"]:
+        ax.axhline(y=32, color='blue', linestyle='--', alpha=0.7, label='Freezing Point (32°F)')
+    fig.tight_layout()
+    fig.subplots_adjust(bottom=0.15)
+    ax.legend()
+    return _save(fig, fmt)
+
+
+def _save(fig, fmt):
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt)
+    return buf.getvalue()
+
+
+def trend_chart(dates, trend, variable, city, state, fmt="png"):
+    """
+    Render the smoothed daily trend with the trend plotter's own drawing code
+    """
+    fig = Figure(figsize=(12, 7))
+    _PLOTTERS[variable][1](fig, pd.DataFrame({'date': dates}), trend, city, state)
+    return _save(fig, fmt)
+
+
+def point_chart(dates, values, variable, city, state, fmt="png"):
+    """
+    Render hourly values with the point plotter's own drawing code
+    """
+    fig = Figure(figsize=(12, 7))
+    _PLOTTERS[variable][0](fig, hourly_frame(dates, values, VARIABLES[variable]["hourly"]), city, state)
+    return _save(fig, fmt)
+
+
+def area_chart(dates, mean, low, high, variable, city, state, fmt="png"):
+    """
+    Render the daily area mean with the band between the area min and max
+    """
+    spec = VARIABLES[variable]
+    fig = Figure(figsize=(12, 7))
+    ax = fig.subplots()
+
+    ax.fill_between(dates, low, high, color=spec["color"], alpha=0.25, label='Area Min to Max')
+    ax.plot(dates, mean, color=spec["color"], label=f'Area Mean {spec["label"]}')
+    ax.set_title(f'Area {spec["label"]} around {city}, {state}', fontsize=16)
+    ax.set_xlabel('Date', fontsize=12)
+    ax.set_ylabel(f'{spec["label"]} ({spec["unit"]})', fontsize=12)
+    ax.grid(True, alpha=0.3)
+
+    fig.text(0.5, 0.01, f"Data from: {dates.min().strftime('%Y-%m-%d')} to {dates.max().strftime('%Y-%m-%d')}",
+             ha='center', fontsize=10)
+    return _finish(fig, ax, spec, fmt)
+
+
+def heatmap_chart(latitudes, longitudes, grid, variable, city, state, fmt="png"):
+    """
+    Render one value per grid point (rows by latitude, columns by longitude) as a heatmap
+    """
+    spec = VARIABLES[variable]
+    fig = Figure(figsize=(9, 8))
+    ax = fig.subplots()
+
+    mesh = ax.pcolormesh(longitudes, latitudes, grid, shading='nearest', cmap='coolwarm')
+    fig.colorbar(mesh, ax=ax, label=f'Mean {spec["label"]} ({spec["unit"]})')
+    ax.set_title(f'Mean {spec["label"]} around {city}, {state}', fontsize=16)
+    ax.set_xlabel('Longitude', fontsize=12)
+    ax.set_ylabel('Latitude', fontsize=12)
+    # Degrees of longitude shrink with latitude, so scale them to keep the grid square on the map
+    ax.set_aspect(1 / math.cos(math.radians(sum(latitudes) / len(latitudes))))
+    fig.tight_layout()
+    return _save(fig, fmt)
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from scipy import signal
+
+# Dtype of the decode -> aggregate -> smooth pipeline. Open-Meteo ships values
+# as float32 and the current pandas/scipy paths keep it; the helpers pin it so
+# that stays true for inputs that arrive as another dtype. The memory saving
+# over the old plotter code comes from hourly_frame not copying the decoded
+# values, not from the dtype (see benchmarks/memorybenchmark.py).
+SERIES_DTYPE = np.float32
+
+
+def hourly_dates(hourly):
+    """
+    Build the UTC time axis for an Open-Meteo hourly block
+    """
+    return pd.date_range(
+        start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
+        end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
+        freq=pd.Timedelta(seconds=hourly.Interval()),
+        inclusive="left"
+    )
+
+
+def decode_hourly(response, variable):
+    """
+    Decode the first hourly variable of an Open-Meteo response into a DataFrame
+    with a 'date' column and a float32 value column named after the variable
+    """
+    hourly = response.Hourly()
+    return hourly_frame(hourly_dates(hourly), hourly.Variables(0).ValuesAsNumpy(), variable)
+
+
+def hourly_frame(dates, values, variable):
+    """
+    Wrap a time axis and a value array in a DataFrame without copying float32 input
+    """
+    # ValuesAsNumpy() is already float32; copy=False keeps it from being duplicated
+    values = np.asarray(values).astype(SERIES_DTYPE, copy=False)
+    return pd.DataFrame({"date": dates, variable: values}, copy=False)
+
+
+def daily_mean(hourly_dataframe):
+    """
+    Average an hourly DataFrame down to one row per day, keeping float32 values
+    """
+    daily_data = hourly_dataframe.resample('D', on='date').mean()
+    daily_data = daily_data.astype(SERIES_DTYPE, copy=False)
+    return daily_data.reset_index()
+
+
+def smooth_trend(values, window_size=14, polyorder=3):
+    """
+    Apply a Savitzky-Golay filter to get the trend, in float32
+    """
+    # savgol_filter upcasts anything that is not float32/float64, so pin the input
+    values = np.asarray(values, dtype=SERIES_DTYPE)
+    return signal.savgol_filter(values, window_size, polyorder)
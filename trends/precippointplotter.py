@@ -1,23 +1,37 @@
-import os
 from datetime import datetime
 
 import matplotlib.pyplot as plt
-import openmeteo_requests
-import pandas as pd
 import requests
-import requests_cache
-from retry_requests import retry
-from dotenv import load_dotenv
 
-load_dotenv()
+from clients.sessions import ARCHIVE_URL, geocode, openmeteo_client
+from reports.summary import print_series_summary
+from trends.hourlyseries import decode_hourly
+
+def plot_hourly(fig, hourly_dataframe, city, state):
+    """
+    Draw the hourly series on fig. The plotter shows it with pyplot and the
+    server renders the same drawing to bytes (trends/charts.py).
+    """
+    # Plot the temperature data
+    ax = fig.subplots()
+    ax.plot(hourly_dataframe['date'], hourly_dataframe['rain'], color='tab:blue')
+    ax.set_title(f'Hourly Precipitation Data for {city}, {state}', fontsize=16)
+    ax.set_xlabel('Date', fontsize=12)
+    ax.set_ylabel('Precipitation (in)', fontsize=12)
+    ax.grid(True, alpha=0.3)
+
+    # Add date display at the bottom of the graph
+    fig.text(0.165, 0.001, f"Data period: {hourly_dataframe['date'].min().strftime('%Y-%m-%d %H:%M')} to {hourly_dataframe['date'].max().strftime('%Y-%m-%d %H:%M')}",
+            ha='center', fontsize=10)
+
+    fig.tight_layout()
+    fig.subplots_adjust(bottom=0.15)  # Make room for the date text at the bottom
+    ax.legend()
 
-authkey = os.getenv("APIKEY")
 
 def precippointplotter():
     # Setup the Open-Meteo API client with cache and retry on error
-    cache_session = requests_cache.CachedSession('.cache', expire_after = -1)
-    retry_session = retry(cache_session, retries = 5, backoff_factor = 0.2)
-    openmeteo = openmeteo_requests.Client(session = retry_session)
+    openmeteo = openmeteo_client()
 
 
     city = input("Enter City: ")
@@ -37,24 +51,13 @@ def precippointplotter():
         print("Date is out of range")
         precippointplotter()
 
-    base_url = "https://geocode.xyz"
-    params = {
-        "locate": (city + " " + state),
-        "region": "US",
-        "json": "1"
-    }
-
-    req_url = f"{base_url}/?{requests.utils.unquote(requests.compat.urlencode(params))}"
     try:
-        resp = requests.get(req_url + f"&auth={authkey}")
-        resp.raise_for_status()
+        geocode_data = geocode(city, state)
     except requests.RequestException as err:
         print("Error:", err)
         exit()
 
-    geocode_data = resp.json()
-
-    url = "https://archive-api.open-meteo.com/v1/archive"
+    url = ARCHIVE_URL
     params = {
         "latitude": geocode_data['latt'],
         "longitude": geocode_data['longt'],
@@ -74,33 +77,9 @@ def precippointplotter():
     print(f"Timezone {response.Timezone()}{response.TimezoneAbbreviation()}")
     print(f"Timezone difference to GMT+0 {response.UtcOffsetSeconds()} s")
 
-    # Process hourly data. The order of variables needs to be the same as requested.
-    hourly = response.Hourly()
-    hourly_rain = hourly.Variables(0).ValuesAsNumpy()
-
-    hourly_data = {"date": pd.date_range(
-        start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
-        end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
-        freq=pd.Timedelta(seconds=hourly.Interval()),
-        inclusive="left"
-    ), "rain": hourly_rain}
-
-    hourly_dataframe = pd.DataFrame(data = hourly_data)
-    print(hourly_dataframe)
-
-    # Plot the temperature data
-    plt.figure(figsize=(12, 7))
-    plt.plot(hourly_dataframe['date'], hourly_dataframe['rain'], color='tab:blue')
-    plt.title(f'Hourly Precipitation Data for {city}, {state}', fontsize=16)
-    plt.xlabel('Date', fontsize=12)
-    plt.ylabel('Precipitation (in)', fontsize=12)
-    plt.grid(True, alpha=0.3)
-
-    # Add date display at the bottom of the graph
-    plt.figtext(0.165, 0.001, f"Data period: {hourly_dataframe['date'].min().strftime('%Y-%m-%d %H:%M')} to {hourly_dataframe['date'].max().strftime('%Y-%m-%d %H:%M')}",
-               ha='center', fontsize=10)
+    # Process hourly data. Values stay float32 end-to-end (see trends/hourlyseries.py)
+    hourly_dataframe = decode_hourly(response, "rain")
+    print_series_summary(hourly_dataframe, "rain", " in")
 
-    plt.tight_layout()
-    plt.subplots_adjust(bottom=0.15)  # Make room for the date text at the bottom
-    plt.legend()
+    plot_hourly(plt.figure(figsize=(12, 7)), hourly_dataframe, city, state)
     plt.show()
\ No newline at end of file
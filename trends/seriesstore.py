@@ -0,0 +1,200 @@
+"""
+Memory-mappable on-disk bundles of decoded hourly series.
+
+A bundle is a directory holding one .npy file per array plus a manifest:
+
+    manifest.json      format, version, location, length and the files below
+    time.npy           int64 seconds since the Unix epoch, UTC
+    <variable>.npy     float32 values, one per time step, NaN where missing
+
+.npy is NumPy's documented fixed-header format, so any process can map the
+arrays read-only with np.load(mmap_mode="r") and share one page-cached copy
+instead of re-fetching and re-decoding.
+
+    python -m trends.seriesstore export --city Denver --state CO --start 1985-01-01 --end 2024-12-31 \\
+        --variables temperature dewpoint --out denver
+    python -m trends.seriesstore info denver
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from clients.chunkedarchive import fetch_archive
+from clients.sessions import geocode
+from trends.hourlyseries import SERIES_DTYPE
+from trends.variables import VARIABLES, archive_params
+
+BUNDLE_FORMAT = "weather-trend-series"
+BUNDLE_VERSION = 1
+MANIFEST = "manifest.json"
+TIME_FILE = "time.npy"
+
+
+def export_series(path, dates, columns, units=None, location=None):
+    """
+    Write a time axis and {name: values} columns as a bundle at path, replacing any
+    bundle already there. Files are written to a temporary directory first, so a
+    reader never maps a half-written bundle, and the old bundle is only deleted
+    once the new one is in place.
+    """
+    seconds = pd.DatetimeIndex(dates).as_unit("s").asi8
+    units = units or {}
+
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(dir=parent, prefix=".series-")
+    try:
+        # mkdtemp is owner-only; bundles are meant to be shared
+        os.chmod(tmp_path, 0o755)
+        np.save(os.path.join(tmp_path, TIME_FILE), seconds)
+        variables = {}
+        for name, values in columns.items():
+            values = np.asarray(values, dtype=SERIES_DTYPE)
+            if len(values) != len(seconds):
+                raise ValueError(f"{name} has {len(values)} values for {len(seconds)} time steps")
+            np.save(os.path.join(tmp_path, f"{name}.npy"), values)
+            variables[name] = {"file": f"{name}.npy", "dtype": values.dtype.name, "unit": units.get(name, "")}
+
+        manifest = {
+            "format": BUNDLE_FORMAT,
+            "version": BUNDLE_VERSION,
+            "location": location or {},
+            "length": len(seconds),
+            "time": {"file": TIME_FILE, "dtype": "int64", "unit": "s", "timezone": "UTC"},
+            "variables": variables
+        }
+        with open(os.path.join(tmp_path, MANIFEST), "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+
+        # The old bundle is moved aside before the new one takes its place, so path
+        # always holds a complete bundle except for the instant between the two renames.
+        # Readers that already mapped the old files keep them until they unmap.
+        old_path = None
+        if os.path.isdir(path):
+            old_path = tempfile.mkdtemp(dir=parent, prefix=".series-old-")
+            os.rename(path, os.path.join(old_path, "bundle"))
+        try:
+            os.rename(tmp_path, path)
+        except BaseException:
+            if old_path:
+                os.rename(os.path.join(old_path, "bundle"), path)
+            raise
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    if old_path:
+        shutil.rmtree(old_path, ignore_errors=True)
+
+
+def export_hourly(path, hourly_dataframe, units=None, location=None):
+    """
+    Write an hourly DataFrame (a date column plus value columns) as a bundle
+    """
+    columns = {name: hourly_dataframe[name].to_numpy() for name in hourly_dataframe.columns if name != 'date'}
+    export_series(path, hourly_dataframe['date'], columns, units, location)
+
+
+def read_manifest(path):
+    with open(os.path.join(path, MANIFEST)) as manifest_file:
+        manifest = json.load(manifest_file)
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"{path} is not a series bundle")
+    if manifest.get("version", 0) > BUNDLE_VERSION:
+        raise ValueError(f"{path} is bundle version {manifest['version']}, this reader handles up to {BUNDLE_VERSION}")
+    return manifest
+
+
+def load_series(path, variables=None):
+    """
+    Map a bundle read-only without copying.
+
+    Returns (manifest, time, {name: values}) where the arrays are np.memmap views of
+    the files. variables limits which value arrays are mapped.
+    """
+    manifest = read_manifest(path)
+    time = np.load(os.path.join(path, manifest["time"]["file"]), mmap_mode="r")
+
+    names = variables or list(manifest["variables"])
+    missing = [name for name in names if name not in manifest["variables"]]
+    if missing:
+        raise KeyError(f"{path} has no {', '.join(missing)}, only {', '.join(manifest['variables'])}")
+
+    values = {}
+    for name in names:
+        array = np.load(os.path.join(path, manifest["variables"][name]["file"]), mmap_mode="r")
+        if len(array) != len(time):
+            raise ValueError(f"{name} in {path} has {len(array)} values for {len(time)} time steps")
+        values[name] = array
+    return manifest, time, values
+
+
+def load_hourly(path, variables=None):
+    """
+    A bundle as the hourly DataFrame the plotters build. Unlike load_series this
+    copies, since pandas needs its own datetime column.
+    """
+    _, time, values = load_series(path, variables)
+    dates = pd.to_datetime(np.asarray(time), unit="s", utc=True)
+    return pd.DataFrame({"date": dates, **{name: np.asarray(array) for name, array in values.items()}})
+
+
+def fetch_bundle(path, city, state, start_date, end_date, variables):
+    """
+    Fetch and decode several variables for one place and range, and export them as one bundle
+    """
+    geocode_data = geocode(city, state)
+    latitude, longitude = geocode_data['latt'], geocode_data['longt']
+
+    dates = None
+    columns = {}
+    units = {}
+    for variable in variables:
+        hourly = VARIABLES[variable]["hourly"]
+        params = archive_params(variable, latitude, longitude, start_date, end_date)
+        _, hourly_dataframe = fetch_archive(params, hourly)
+        if dates is None:
+            dates = hourly_dataframe['date']
+        columns[hourly] = hourly_dataframe[hourly].to_numpy()
+        units[hourly] = VARIABLES[variable]["unit"]
+
+    location = {"city": city, "state": state, "latitude": float(latitude), "longitude": float(longitude)}
+    export_series(path, dates, columns, units, location)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog="python -m trends.seriesstore",
+                                         description="Export and inspect memory-mappable series bundles")
+    subcommands = arg_parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subcommands.add_parser("export", help="fetch series and write them as a bundle")
+    export_parser.add_argument("--city", required=True)
+    export_parser.add_argument("--state", required=True)
+    export_parser.add_argument("--start", required=True, help="YYYY-MM-DD")
+    export_parser.add_argument("--end", required=True, help="YYYY-MM-DD")
+    export_parser.add_argument("--variables", nargs="+", choices=list(VARIABLES), default=list(VARIABLES))
+    export_parser.add_argument("--out", required=True, help="bundle directory")
+
+    info_parser = subcommands.add_parser("info", help="describe a bundle")
+    info_parser.add_argument("path")
+
+    args = arg_parser.parse_args()
+    if args.command == "export":
+        fetch_bundle(args.out, args.city, args.state, args.start, args.end, args.variables)
+        print(f"Wrote {args.out}")
+    else:
+        manifest, time, values = load_series(args.path)
+        print(json.dumps(manifest["location"]))
+        if len(time):
+            print(f"{manifest['length']:,} steps, {pd.to_datetime(time[0], unit='s', utc=True)} "
+                  f"to {pd.to_datetime(time[-1], unit='s', utc=True)}")
+        for name, array in values.items():
+            print(f"{name}: {array.dtype} {manifest['variables'][name]['unit']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# Request parameters and chart styling per variable, for code paths that are
+# not tied to one plotter (server mode, batch jobs). The extra params match what
+# the matching plotter sends so both share cache entries.
+VARIABLES = {
+    "temperature": {
+        "hourly": "temperature_2m",
+        "label": "Temperature",
+        "unit": "°F",
+        "color": "tab:red",
+        "freezing_line": True,
+        "params": {"temperature_unit": "fahrenheit", "wind_speed_unit": "mph"}
+    },
+    "precipitation": {
+        "hourly": "rain",
+        "label": "Precipitation",
+        "unit": "in",
+        "color": "tab:blue",
+        "freezing_line": False,
+        "params": {"temperature_unit": "fahrenheit", "wind_speed_unit": "mph", "precipitation_unit": "inch"}
+    },
+    "dewpoint": {
+        "hourly": "dew_point_2m",
+        "label": "Dew Point",
+        "unit": "°F",
+        "color": "tab:blue",
+        "freezing_line": False,
+        "params": {"temperature_unit": "fahrenheit", "wind_speed_unit": "mph", "precipitation_unit": "inch"}
+    }
+}
+
+
+def archive_params(variable, latitude, longitude, start_date, end_date):
+    """
+    Open-Meteo archive parameters for one of the VARIABLES
+    """
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "start_date": start_date,
+        "end_date": end_date,
+        "hourly": VARIABLES[variable]["hourly"],
+        **VARIABLES[variable]["params"]
+    }